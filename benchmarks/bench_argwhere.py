@@ -0,0 +1,48 @@
+"""
+compares Base.argwhere against the previous per-element lambda implementation
+
+usage: python -m benchmarks.bench_argwhere [n_rows] [invalid_rate]
+"""
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from psypy.clean.measure import Base
+
+
+def argwhere_lambda(df):
+    # previous implementation, kept as reference
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+    idx = np.argwhere(df)
+    idx = pd.DataFrame(idx, columns=['index', 'column'])
+    idx['index'] = idx['index'].map(lambda x: df.index[x])
+    idx['column'] = idx['column'].map(lambda x: df.columns[x])
+    return idx
+
+
+def make_mask(n_rows, n_cols=42, invalid_rate=0.01, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.MultiIndex.from_arrays(
+        [np.arange(n_rows).astype(str), np.ones(n_rows, dtype=int), np.full(n_rows, 30.0)],
+        names=['ID', 'SES', 'AGE']
+    )
+    return pd.DataFrame(
+        rng.random((n_rows, n_cols)) < invalid_rate,
+        index=index,
+        columns=[f"dass42_{i + 1}" for i in range(n_cols)]
+    )
+
+
+def main(n_rows=1_000_000, invalid_rate=0.01):
+    mask = make_mask(n_rows, invalid_rate=invalid_rate)
+    t_new = min(timeit.repeat(lambda: Base.argwhere(mask), number=1, repeat=3))
+    t_old = min(timeit.repeat(lambda: argwhere_lambda(mask), number=1, repeat=1))
+    print(f"rows={n_rows} invalid_cells={int(mask.values.sum())}")
+    print(f"lambda: {t_old:.3f}s  vectorized: {t_new:.3f}s  speedup: {t_old / t_new:.1f}x")
+
+
+if __name__ == '__main__':
+    main(*[float(x) if '.' in x else int(x) for x in sys.argv[1:]])
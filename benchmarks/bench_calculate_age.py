@@ -0,0 +1,87 @@
+"""
+compares Base.calculate_age against the previous merge-based implementation
+for both the string and dict forms of date_col
+
+usage: python -m benchmarks.bench_calculate_age [n_ids]
+"""
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from psypy.clean.measure import Base
+
+
+def calculate_age_merge(df, how, dob_col, date_col, **kwargs):
+    # previous implementation, kept as reference
+    dob = df.reset_index().set_index('ID')[dob_col].dropna().rename('_dob')
+    if isinstance(date_col, dict):
+        dates = []
+        for k in date_col:
+            date = df.reset_index().set_index('ID')[date_col[k]].rename('_date').dropna().to_frame()
+            date['SES'] = k
+            dates.append(date)
+        dates = pd.concat(dates, axis=0).reset_index().set_index(['ID', 'SES'])['_date']
+        df = df.reset_index().set_index(['ID', 'SES'])
+        df = df.merge(dates, how='left', left_index=True, right_index=True)
+        df = df.reset_index().set_index('ID')
+    else:
+        df = df.copy()
+        df['_date'] = df[date_col]
+        df = df.reset_index().set_index('ID')
+    df = df.merge(dob, how='left', left_index=True, right_index=True)
+    df['_age'] = np.floor(
+        (pd.to_datetime(df['_date'], format=kwargs.get('format'))
+         - pd.to_datetime(df['_dob'], format=kwargs.get('format'))) / pd.Timedelta(days=365.25))
+    if how == 'replace':
+        df['AGE'] = df['_age']
+    else:
+        df['AGE'] = df['AGE'].fillna(df['_age'])
+    df = df.drop(columns=['_date', '_dob', '_age'])
+    return df.reset_index().set_index(['ID', 'SES', 'AGE'])
+
+
+def make_data(n_ids, n_ses=3, seed=0):
+    """
+    one screening row per ID holding dob and session dates, plus one row per session
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.array([f"sub{i:07d}" for i in range(n_ids)])
+
+    def random_dates(start, n):
+        days = rng.integers(0, 3650, n)
+        return (np.datetime64(start) + days.astype('timedelta64[D]')).astype(str)
+
+    screening = pd.DataFrame({
+        'ID': ids,
+        'SES': 'screening',
+        'dob': random_dates('1950-01-01', n_ids),
+        **{f'date_ses{k}': random_dates('2010-01-01', n_ids) for k in range(n_ses)}
+    })
+    sessions = pd.DataFrame({
+        'ID': np.tile(ids, n_ses),
+        'SES': np.repeat([f'ses{k}' for k in range(n_ses)], n_ids),
+        'date': random_dates('2010-01-01', n_ids * n_ses)
+    })
+    df = pd.concat([screening, sessions], axis=0, ignore_index=True)
+    df['AGE'] = np.nan
+    return df.set_index(['ID', 'SES', 'AGE'])
+
+
+def main(n_ids=100_000):
+    df = make_data(n_ids)
+    forms = {
+        'str': 'date',
+        'dict': {f'ses{k}': f'date_ses{k}' for k in range(3)}
+    }
+    print(f"rows={len(df)}")
+    for name, date_col in forms.items():
+        kwargs = dict(how='replace', dob_col='dob', date_col=date_col, format='%Y-%m-%d')
+        t_new = min(timeit.repeat(lambda: Base.calculate_age(df, **kwargs), number=1, repeat=3))
+        t_old = min(timeit.repeat(lambda: calculate_age_merge(df, **kwargs), number=1, repeat=3))
+        print(f"date_col={name}: merge: {t_old:.3f}s  factorize: {t_new:.3f}s  speedup: {t_old / t_new:.1f}x")
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,40 @@
+"""
+compares Base.is_invalid_discrete (range kernel for contiguous integers) against the previous hashed isin
+
+usage: python -m benchmarks.bench_discrete [n_rows] [invalid_rate]
+"""
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from psypy.clean.clinical import DASS42
+from psypy.clean.measure import Base
+
+
+def is_invalid_isin(df, vals):
+    # previous implementation, kept as reference
+    return ~df.isin(vals) & ~df.isna()
+
+
+def make_data(n_rows, invalid_rate=0.01, missing_rate=0.01, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.integers(0, 4, size=(n_rows, len(DASS42.get_cols()))).astype(float)
+    x[rng.random(x.shape) < invalid_rate] = 5
+    x[rng.random(x.shape) < missing_rate] = np.nan
+    return pd.DataFrame(x, columns=DASS42.get_cols())
+
+
+def main(n_rows=1_000_000, invalid_rate=0.01):
+    df = make_data(n_rows, invalid_rate=invalid_rate)
+    vals = [i for i in range(0, 3 + 1)]
+    same = Base.is_invalid_discrete(df, vals).equals(is_invalid_isin(df, vals))
+    t_old = min(timeit.repeat(lambda: is_invalid_isin(df, vals), number=1, repeat=3))
+    t_new = min(timeit.repeat(lambda: Base.is_invalid_discrete(df, vals), number=1, repeat=3))
+    print(f"rows={n_rows} cols={df.shape[1]} invalid_rate={invalid_rate} same={same}")
+    print(f"isin: {t_old:.3f}s  range: {t_new:.3f}s  speedup: {t_old / t_new:.1f}x")
+
+
+if __name__ == '__main__':
+    main(*[float(x) if '.' in x else int(x) for x in sys.argv[1:]])
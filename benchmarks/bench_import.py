@@ -0,0 +1,46 @@
+"""
+compares the import cost of one measure through the lazy registry against importing every measure module
+(what the subpackage __init__ files did before the registry)
+costs are summed from python -X importtime over psypy modules only, since numpy and pandas are shared by both
+and dominate (and add noise to) the wall time
+
+usage: python -m benchmarks.bench_import [repeat]
+"""
+import subprocess
+import sys
+
+from psypy.clean import registry
+
+LAZY = "from psypy.clean.clinical import PHQ9"
+# import statements since importlib.import_module is not reported by -X importtime
+EAGER = ''.join(f"import {module}\n" for module in sorted(set(registry.get_table().values()))) + LAZY
+
+
+def time_import(code):
+    """
+    :param code: statements to run in a fresh interpreter
+    :return: tuple of summed self import time (s) and number of psypy modules imported
+    """
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            check=True, capture_output=True, text=True).stderr
+    total, n = 0, 0
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip().startswith('psypy'):
+            total += int(parts[0].split(':')[1])
+            n += 1
+    return total / 1e6, n
+
+
+def main(repeat=10):
+    (t_lazy, n_lazy), (t_eager, n_eager) = (
+        min(time_import(code) for _ in range(repeat)) for code in [LAZY, EAGER]
+    )
+    print(f"from psypy.clean.clinical import PHQ9 (psypy modules only, best of {repeat})")
+    print(f"eager: {t_eager * 1000:.1f}ms ({n_eager} modules)  lazy: {t_lazy * 1000:.1f}ms ({n_lazy} modules)  "
+          f"speedup: {t_eager / t_lazy:.1f}x")
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
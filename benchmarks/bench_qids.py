@@ -0,0 +1,50 @@
+"""
+compares QIDS.score (grouped max reduction) against the previous nanmax / vstack implementation
+
+usage: python -m benchmarks.bench_qids [n_rows] [missing_rate]
+"""
+import sys
+import timeit
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from psypy.clean.clinical.qids import QIDS
+
+
+def score_vstack(df):
+    # previous implementation, kept as reference
+    prefix = QIDS.get_prefix()
+    df = df[QIDS.get_schema().cols].astype(float)
+    subscores = (
+        np.nanmax(df[[f"{prefix}_{i}" for i in range(1, 4 + 1)]], axis=1),
+        df[f"{prefix}_5"],
+        np.nanmax(df[[f"{prefix}_{i}" for i in range(6, 9 + 1)]], axis=1),
+        np.sum(df[[f"{prefix}_{i}" for i in range(10, 14 + 1)]].values, axis=1),
+        np.nanmax(df[[f"{prefix}_{i}" for i in range(15, 16 + 1)]], axis=1)
+    )
+    return pd.Series(np.sum(np.vstack(subscores).T, axis=1), index=df.index)
+
+
+def make_data(n_rows, missing_rate=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.integers(0, 4, size=(n_rows, 16)).astype(float)
+    x[rng.random(x.shape) < missing_rate] = np.nan
+    return pd.DataFrame(x, columns=QIDS.get_cols())
+
+
+def main(n_rows=1_000_000, missing_rate=0.05):
+    df = make_data(n_rows, missing_rate=missing_rate)
+    with warnings.catch_warnings():
+        # all missing groups warn in nanmax
+        warnings.simplefilter('ignore', RuntimeWarning)
+        same = np.allclose(QIDS.score(df), score_vstack(df), equal_nan=True)
+        t_old = min(timeit.repeat(lambda: score_vstack(df), number=1, repeat=3))
+    t_new = min(timeit.repeat(lambda: QIDS.score(df), number=1, repeat=3))
+    print(f"rows={n_rows} missing_rate={missing_rate} same={same}")
+    print(f"vstack: {t_old:.3f}s  reduceat: {t_new:.3f}s  speedup: {t_old / t_new:.1f}x")
+
+
+if __name__ == '__main__':
+    main(*[float(x) if '.' in x else int(x) for x in sys.argv[1:]])
@@ -0,0 +1,55 @@
+"""
+compares reading a wide export with default pd.read_csv against pipeline.read_measures for a few measures
+
+usage: python -m benchmarks.bench_read [n_rows] [n_other_cols]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from psypy.clean.clinical import DASS42, PHQ9
+from psypy.clean.cognitive import WebNeuroCompatible
+from psypy.clean.pipeline import read_measures
+from psypy.clean.registry import get_measures
+
+
+def make_export(path, n_rows, n_other_cols, seed=0):
+    """
+    writes a csv with the columns of every measure and n_other_cols unrelated float columns
+    """
+    rng = np.random.default_rng(seed)
+    cols = [col for measure in get_measures() for col in measure.get_cols()]
+    df = pd.DataFrame(rng.integers(0, 4, size=(n_rows, len(cols))), columns=cols)
+    other = pd.DataFrame(rng.random((n_rows, n_other_cols)).round(3), columns=[f"other_{i}" for i in range(n_other_cols)])
+    df = pd.concat([df, other], axis=1)
+    df.insert(0, 'AGE', 30.0)
+    df.insert(0, 'SES', 'baseline')
+    df.insert(0, 'ID', np.arange(n_rows))
+    df.to_csv(path, index=False)
+
+
+def main(n_rows=100_000, n_other_cols=200):
+    measures = [PHQ9, DASS42, WebNeuroCompatible]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'export.csv')
+        make_export(path, n_rows, n_other_cols)
+
+        def read_default():
+            return pd.read_csv(path).set_index(['ID', 'SES', 'AGE'])
+
+        t_old = min(timeit.repeat(read_default, number=1, repeat=3))
+        t_new = min(timeit.repeat(lambda: read_measures(path, measures), number=1, repeat=3))
+        m_old = read_default().memory_usage(deep=True).sum()
+        m_new = read_measures(path, measures).memory_usage(deep=True).sum()
+        size = os.path.getsize(path)
+    print(f"rows={n_rows} file={size / 1e6:.0f}MB measures={[m.__name__ for m in measures]}")
+    print(f"read_csv: {t_old:.2f}s {m_old / 1e6:.0f}MB  read_measures: {t_new:.2f}s {m_new / 1e6:.0f}MB  "
+          f"speedup: {t_old / t_new:.1f}x  memory: {m_old / m_new:.1f}x")
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,93 @@
+"""
+synthetic data generators for every concrete measure class
+"""
+import numpy as np
+import pandas as pd
+
+from psypy.clean import registry
+from psypy.clean.measure import Measure
+
+
+# candidate values probed against check_range to find each column's valid values
+CANDIDATES = np.arange(-5, 121)
+
+# valid values for columns that only accept strings
+STRING_VALUES = {
+    'summary_sex': ['M', 'F', 'O'],
+    'summary_race': ['Asian', 'Black or African American', 'White', 'More Than One Race', 'Other'],
+}
+
+# value used for invalid cells
+INVALID = 999
+
+
+def get_measures():
+    """
+    :return: list of every concrete measure class in psypy.clean
+    """
+    return registry.get_measures()
+
+
+def get_valid_values(measure):
+    """
+    finds valid values of each column by probing check_range one column at a time
+    :param measure: measure class
+    :return: dict mapping column to array of valid values (None if any value is valid)
+    """
+    valid = {}
+    for col in measure.get_cols():
+        df = pd.DataFrame(np.nan, index=range(len(CANDIDATES)), columns=measure.get_cols())
+        df[col] = CANDIDATES.astype(float)
+        invalid = measure.check_range(df)
+        rows = invalid.loc[invalid['column'] == col, 'index'].unique()
+        if len(rows) == 0:
+            valid[col] = None
+        elif len(rows) == len(CANDIDATES):
+            valid[col] = np.array(STRING_VALUES[col], dtype=object)
+        else:
+            valid[col] = np.delete(CANDIDATES, rows)
+    return valid
+
+
+def make_index(n_rows, n_ses=2):
+    ids = np.arange(n_rows) // n_ses
+    return pd.MultiIndex.from_arrays(
+        [[f"sub{i:07d}" for i in ids], np.arange(n_rows) % n_ses + 1, np.full(n_rows, 30.5)],
+        names=['ID', 'SES', 'AGE']
+    )
+
+
+def make_data(measure, n_rows, invalid_rate=0.01, missing_rate=0.01, with_scores=False, seed=0):
+    """
+    generates valid data for a measure with a fraction of invalid and missing cells
+    :param measure: measure class
+    :param n_rows: number of rows
+    :param invalid_rate: fraction of cells set to an out of range value
+    :param missing_rate: fraction of cells set to missing
+    :param with_scores: whether to include (recalculated) score columns, as in exports that already hold scores
+    :param seed: random seed
+    :return: DataFrame indexed by ID, SES, AGE
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+    for col, values in get_valid_values(measure).items():
+        if values is None:
+            data[col] = rng.random(n_rows) * 100
+        else:
+            data[col] = values[rng.integers(0, len(values), n_rows)]
+    df = pd.DataFrame(data, index=make_index(n_rows))
+
+    # cross column rules (e.g. maze completion time >= initiation time)
+    rules = measure.get_schema().range_rules
+    if rules is not None:
+        for a, b in zip(rules['cols'][rules['cross_a']], rules['cols'][rules['cross_b']]):
+            df[a] = np.maximum(df[a], df[b])
+
+    if with_scores and issubclass(measure, Measure) and measure.get_score_cols():
+        df = pd.concat([df, measure.score(df)], axis=1)
+
+    # invalid / missing cells in the items only
+    numeric = [col for col in measure.get_cols() if df[col].dtype != object]
+    draw = rng.random((n_rows, len(numeric)))
+    df[numeric] = df[numeric].mask(draw < invalid_rate, INVALID).mask(draw > 1 - missing_rate)
+    return df
@@ -0,0 +1,113 @@
+"""
+times the cleaning pipeline stages for every measure across data sizes
+
+usage:
+    python -m benchmarks.run --sizes 1000 100000 1000000 --invalid-rate 0.01 --output results.json
+    python -m benchmarks.run --sizes 1000 100000 --compare results.json  # fails on regressions
+"""
+import argparse
+import json
+import platform
+import sys
+import timeit
+
+import pandas as pd
+
+from psypy.clean.measure import Base, Measure
+from .generators import get_measures, make_data
+from .bench_calculate_age import make_data as make_age_data
+
+
+def time_stage(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def get_stages(measure, df):
+    """
+    :return: dict mapping stage name to function running it on df
+    """
+    items = measure.subset_relevant_cols(df)
+    stages = {
+        'check_range': lambda: measure.check_range(items),
+        'process': lambda: measure.process(df, None, keep='last'),
+    }
+    if issubclass(measure, Measure):
+        scored = pd.concat([items, measure.score(items)], axis=1)
+        stages['score'] = lambda: measure.score(items)
+        stages['handle_duplicate'] = lambda: Measure.handle_duplicate(scored, keep='last')
+    return stages
+
+
+def run(sizes, invalid_rate, measures=None, repeat=3):
+    """
+    :param sizes: list of number of rows
+    :param invalid_rate: fraction of invalid cells
+    :param measures: list of measure class names (all if None)
+    :param repeat: number of repeats (the minimum time is kept)
+    :return: list of dicts with measure, stage, n_rows and seconds
+    """
+    results = []
+    for n_rows in sizes:
+        for measure in get_measures():
+            if measures is not None and measure.__name__ not in measures:
+                continue
+            df = make_data(measure, n_rows, invalid_rate=invalid_rate, with_scores=True)
+            for stage, func in get_stages(measure, df).items():
+                seconds = time_stage(func, repeat)
+                results.append({'measure': measure.__name__, 'stage': stage, 'n_rows': n_rows, 'seconds': seconds})
+                print(f"{measure.__name__:>22} {stage:>16} {n_rows:>9} {seconds:9.4f}s", flush=True)
+
+        # age calculation does not depend on the measure (about n_rows rows, dob on separate rows)
+        df = make_age_data(max(n_rows // 4, 1))
+        for name, date_col in [('str', 'date'), ('dict', {f'ses{k}': f'date_ses{k}' for k in range(3)})]:
+            seconds = time_stage(
+                lambda: Base.calculate_age(df, how='replace', dob_col='dob', date_col=date_col), repeat
+            )
+            results.append({'measure': None, 'stage': f'calculate_age_{name}', 'n_rows': n_rows, 'seconds': seconds})
+            print(f"{'':>22} {'calculate_age_' + name:>16} {n_rows:>9} {seconds:9.4f}s", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    :return: list of (result, baseline seconds) slower than baseline by more than tolerance
+    """
+    key = lambda x: (x['measure'], x['stage'], x['n_rows'])
+    baseline = {key(x): x['seconds'] for x in baseline}
+    return [(x, baseline[key(x)]) for x in results
+            if key(x) in baseline and x['seconds'] > baseline[key(x)] * tolerance]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--invalid-rate', type=float, default=0.01)
+    parser.add_argument('--measures', nargs='+', default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None, help='json file to store results')
+    parser.add_argument('--compare', default=None, help='json file of baseline results')
+    parser.add_argument('--tolerance', type=float, default=1.5, help='allowed slowdown relative to baseline')
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.invalid_rate, measures=args.measures, repeat=args.repeat)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'invalid_rate': args.invalid_rate,
+                'results': results
+            }, f, indent=1)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+        for result, seconds in regressions:
+            print(f"REGRESSION {result['measure']} {result['stage']} {result['n_rows']}: "
+                  f"{seconds:.4f}s -> {result['seconds']:.4f}s")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
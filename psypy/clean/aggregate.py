@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from .measure import Base
+
+
+def get_keys(indices, sessions=None):
+    """
+    collects participants and sessions across the (ID, SES, AGE) indices of several measures
+    :param indices: iterable of pd.MultiIndex
+    :param sessions: list of sessions in output order (order of first appearance if None)
+    :return: tuple of pd.Index of IDs and pd.Index of sessions
+    """
+    ids, ses = [], []
+    for index in indices:
+        ids.append(index.get_level_values('ID').unique())
+        ses.append(index.get_level_values('SES').unique())
+    ids = pd.Index(pd.unique(np.concatenate(ids)) if ids else [], name='ID')
+    if sessions is None:
+        sessions = pd.unique(np.concatenate(ses)) if ses else []
+    return ids, pd.Index(sessions)
+
+
+def get_codes(index, ids, sessions):
+    """
+    integer codes of the ID and SES of each row (-1 if not in ids or sessions)
+    :param index: pd.MultiIndex with ID and SES levels
+    :param ids: pd.Index of IDs
+    :param sessions: pd.Index of sessions
+    :return: tuple of np.ndarray of ID codes and SES codes
+    """
+    id_codes = ids.get_indexer(index.get_level_values('ID'))
+    ses_codes = sessions.get_indexer(index.get_level_values('SES'))
+    found = (id_codes >= 0) & (ses_codes >= 0)
+    if pd.Index(id_codes[found] * len(sessions) + ses_codes[found]).has_duplicates:
+        raise ValueError('Can not aggregate more than one row per ID and SES')
+    return id_codes, ses_codes
+
+
+def widen(df, ids, sessions):
+    """
+    pivots one long measure into one row per ID with a {col}_ses{ses} column per session
+    rows are placed by integer codes so no merge is needed, and each column keeps its dtype (e.g. Int8, category)
+    :param df: DataFrame indexed by ID, SES, AGE
+    :param ids: pd.Index of IDs (rows of the output)
+    :param sessions: pd.Index of sessions
+    :return: DataFrame indexed by ids
+    """
+    id_codes, ses_codes = get_codes(df.index, ids, sessions)
+    # extension arrays (nullable ints, categoricals) keep their dtype when filled, numpy ones are upcast as in reindex
+    arrays = [x.array if isinstance(x.dtype, pd.api.extensions.ExtensionDtype) else x.to_numpy()
+              for _, x in df.items()]
+    wide = {}
+    for k, ses in enumerate(sessions):
+        rows = np.flatnonzero((ses_codes == k) & (id_codes >= 0))
+        # row of df for each ID, -1 (filled with the missing value of the dtype) if it has none at this session
+        pos = np.full(len(ids), -1)
+        pos[id_codes[rows]] = rows
+        for col, values in zip(df.columns, arrays):
+            wide[f"{col}_ses{ses}"] = pd.api.extensions.take(values, pos, allow_fill=True)
+    return pd.DataFrame(wide, index=ids)
+
+
+def get_age(df, ids, sessions):
+    """
+    age of each ID at each session (nan if not in df)
+    :param df: DataFrame indexed by ID, SES, AGE
+    :param ids: pd.Index of IDs
+    :param sessions: pd.Index of sessions
+    :return: np.ndarray of shape (len(ids), len(sessions))
+    """
+    id_codes, ses_codes = get_codes(df.index, ids, sessions)
+    age = np.full((len(ids), len(sessions)), np.nan)
+    found = (id_codes >= 0) & (ses_codes >= 0)
+    age[id_codes[found], ses_codes[found]] = df.index.get_level_values('AGE').to_numpy(dtype=float)[found]
+    return age
+
+
+def assemble(frames, ids, sessions):
+    """
+    widens each measure in turn and places them side by side
+    age of each session comes first (first non missing age across measures), followed by each measure
+    :param frames: iterable of DataFrames indexed by ID, SES, AGE (only one is needed at a time)
+    :param ids: pd.Index of IDs
+    :param sessions: pd.Index of sessions
+    :return: DataFrame indexed by ID
+    """
+    age = np.full((len(ids), len(sessions)), np.nan)
+    blocks = []
+    for df in frames:
+        age = np.where(np.isnan(age), get_age(df, ids, sessions), age)
+        blocks.append(widen(df, ids, sessions))
+    age = pd.DataFrame(age, index=ids, columns=[f"AGE_ses{ses}" for ses in sessions])
+    # all blocks share the ids index, so concat only places them side by side
+    return pd.concat([age, *blocks], axis=1)
+
+
+def to_wide(frames, sessions=None):
+    """
+    aggregates cleaned measures into one participant level table with {col}_ses{ses} columns
+    :param frames: dict (e.g. returned by process_many) or list of DataFrames indexed by ID, SES, AGE
+    :param sessions: list of sessions in output order (order of first appearance if None)
+    :return: DataFrame indexed by ID
+    """
+    if isinstance(frames, dict):
+        frames = list(frames.values())
+    ids, sessions = get_keys([df.index for df in frames], sessions)
+    return assemble(frames, ids, sessions)
+
+
+def to_wide_files(paths, sessions=None):
+    """
+    same as to_wide from files written by Base.save, loading one measure at a time
+    a first pass reads only the index of each file to find all participants and sessions
+    :param paths: list of paths to files written by save (parquet reads the index without any data)
+    :param sessions: list of sessions in output order (order of first appearance if None)
+    :return: DataFrame indexed by ID
+    """
+    ids, sessions = get_keys((Base.load(path, columns=[]).index for path in paths), sessions)
+    return assemble((Base.load(path) for path in paths), ids, sessions)
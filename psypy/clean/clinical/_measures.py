@@ -0,0 +1,15 @@
+# generated by python -m psypy.clean.registry, do not edit
+MEASURES = {
+    'BAIS': 'bais',
+    'BRISC15': 'brisc',
+    'DASS42': 'dass',
+    'ERQ': 'erq',
+    'GAD7': 'gad',
+    'HDRS21': 'hdrs',
+    'HDRS17': 'hdrs',
+    'PHQ9': 'phq',
+    'QIDS': 'qids',
+    'SOFASRating': 'sofas',
+    'SOFASCategory': 'sofas',
+    'WHOQOL': 'whoqol',
+}
@@ -1,7 +1,5 @@
 from ..measure import Measure
 
-import pandas as pd
-
 
 # BAIS (Behavioral Activation and Behavioral Inhibition Scales (BAI))
 # https://arc.psych.wisc.edu/self-report/behavioral-activation-and-behavioral-inhibition-scales-bai/
@@ -34,25 +32,21 @@ class BAIS(Measure):
     @classmethod
     def check_range(cls, df):
         vals = [i for i in range(1, 4 + 1)]
-        return cls.argwhere(cls.is_invalid_discrete(df[cls.get_cols()], vals))
+        return cls.argwhere(cls.is_invalid_discrete(cls.get_items(df), vals))
+
+    @classmethod
+    def get_subscales(cls):
+        return {
+            'score_drive': [2, 7, 9, 17],
+            'score_fun': [4, 8, 12, 16],
+            'score_reward': [3, 5, 11, 14, 19],
+            'score_bis': [1, 6, 10, 13, 15, 18, 20]
+        }
+
+    @classmethod
+    def get_reverse_items(cls):
+        return [1, 18]
 
     @classmethod
     def score(cls, df):
-        # reverse code for scoring
-        rev_cols = [1, 18]
-        df = cls.reverse_code(df, rev_cols, cls.get_restr(), 1, 4)
-
-        # score
-        drive = [2, 7, 9, 17]
-        fun = [4, 8, 12, 16]
-        reward = [3, 5, 11, 14, 19]
-        bis = [1, 6, 10, 13, 15, 18, 20]
-
-        scored = pd.DataFrame(
-            [],
-            columns=[f"{cls.get_prefix()}_{x}" for x in cls.get_score_suffixes()]
-        )
-        for score, cols in zip(scored.columns, [drive, fun, reward, bis]):
-            cols = cls.subset_cols_num(df.columns, cols, cls.get_restr())
-            scored[score] = df[cols].sum(axis=1, skipna=False)
-        return scored
+        return cls.sum_subscales(df)
@@ -1,9 +1,6 @@
 from ..measure import Measure
 
 
-import pandas as pd
-
-
 # Brief Risk-Resilience Index for Screening
 # https://pmc.ncbi.nlm.nih.gov/articles/PMC3489810/
 
@@ -23,23 +20,16 @@ class BRISC15(Measure):
     @classmethod
     def check_range(cls, df):
         vals = [i for i in range(1, 5 + 1)]
-        return cls.argwhere(cls.is_invalid_discrete(df[cls.get_cols()], vals))
+        return cls.argwhere(cls.is_invalid_discrete(cls.get_items(df), vals))
 
     @classmethod
-    def score(cls, df):
-        mapping = {
-            'neg': [1, 2, 3, 4, 5],
-            'emo': [6, 7, 8, 9, 10],
-            'soc': [11, 12, 13, 14, 15]
+    def get_subscales(cls):
+        return {
+            'score_neg': [1, 2, 3, 4, 5],
+            'score_emo': [6, 7, 8, 9, 10],
+            'score_soc': [11, 12, 13, 14, 15]
         }
 
-        scores = pd.DataFrame(
-            [],
-            columns=[f"{cls.get_prefix()}_{x}" for x in cls.get_score_suffixes()]
-        )
-        for score, suffix in zip(mapping, cls.get_score_suffixes()):
-            cols = mapping[score]
-            scores[f"{cls.get_prefix()}_{suffix}"] = df[
-                cls.subset_cols_num(df.columns, cols, fr"{cls.get_prefix()}_(\d+)")
-            ].sum(axis=1, skipna=False)
-        return scores
+    @classmethod
+    def score(cls, df):
+        return cls.sum_subscales(df)
@@ -22,10 +22,10 @@ class GAD7(Measure):
     @classmethod
     def check_range(cls, df):
         vals = [i for i in range(0, 3 + 1)]
-        return cls.argwhere(cls.is_invalid_discrete(df[cls.get_cols()], vals))
+        return cls.argwhere(cls.is_invalid_discrete(cls.get_items(df), vals))
 
     @classmethod
     def score(cls, df):
-        score = df[cls.get_cols()].sum(axis=1, skipna=False)
+        score = cls.get_items(df).sum(axis=1, skipna=False)
         score.name = f"{cls.get_prefix()}_{cls.get_score_suffixes()[-1]}"
         return score
@@ -1,8 +1,5 @@
 from ..measure import Measure
 
-import numpy as np
-import pandas as pd
-
 
 # Quick Inventory of Depressive Symptomatology (QIDS)
 
@@ -25,25 +22,23 @@ class QIDS(Measure):
     @classmethod
     def check_range(cls, df):
         vals = [i for i in range(0, 3 + 1)]
-        return cls.argwhere(cls.is_invalid_discrete(df[cls.get_cols()], vals))
+        return cls.argwhere(cls.is_invalid_discrete(cls.get_items(df), vals))
+
+    @classmethod
+    def get_max_groups(cls):
+        return {
+            'score': [
+                # sleep subscore
+                [1, 2, 3, 4],
+                [5],
+                # appetite / weight subscore
+                [6, 7, 8, 9],
+                [10], [11], [12], [13], [14],
+                # psychomotor subscore
+                [15, 16]
+            ]
+        }
 
     @classmethod
     def score(cls, df):
-        subscores = (
-            # sleep subscore (items 1-4)
-            np.nanmax(df[[fr"{cls.get_prefix()}_{i}" for i in range(1, 4 + 1)]], axis=1),
-            # item 5
-            df[fr"{cls.get_prefix()}_5"],
-            # appetite / weight subscore (items 6-9)
-            np.nanmax(df[[fr"{cls.get_prefix()}_{i}" for i in range(6, 9 + 1)]], axis=1),
-            # items 10-14
-            np.sum(df[[fr"{cls.get_prefix()}_{i}" for i in range(10, 14 + 1)]].values, axis=1),
-            # psychomotor subscore
-            np.nanmax(df[[fr"{cls.get_prefix()}_{i}" for i in range(15, 16 + 1)]], axis=1)
-        )
-        score = pd.Series(
-            np.sum(np.vstack(subscores).T, axis=1),
-            name=f"{cls.get_prefix()}_{cls.get_score_suffixes()[-1]}",
-            index=df.index
-        )
-        return score
+        return cls.sum_max_groups(df).squeeze(axis=1)
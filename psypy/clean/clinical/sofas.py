@@ -22,7 +22,7 @@ class SOFASRating(Measure):
     @classmethod
     def check_range(cls, df):
         vals = [i for i in range(0, 100 + 1)]
-        return cls.argwhere(cls.is_invalid_discrete(df[cls.get_cols()], vals))
+        return cls.argwhere(cls.is_invalid_discrete(cls.get_items(df), vals))
 
     @classmethod
     def score(cls, df):
@@ -45,7 +45,7 @@ class SOFASCategory(Measure):
     @classmethod
     def check_range(cls, df):
         vals = [i for i in range(0, 10 + 1)]
-        return cls.argwhere(cls.is_invalid_discrete(df[cls.get_cols()], vals))
+        return cls.argwhere(cls.is_invalid_discrete(cls.get_items(df), vals))
 
     @classmethod
     def score(cls, df):
@@ -1,9 +1,6 @@
 from ..measure import Measure
 
 
-import pandas as pd
-
-
 # World Health Organization Quality-of-Life Scale
 # https://depts.washington.edu/seaqol/docs/WHOQOL-BREF%20and%20Scoring%20Instructions.pdf
 
@@ -35,25 +32,21 @@ class WHOQOL(Measure):
     @classmethod
     def check_range(cls, df):
         vals = [i for i in range(1, 5 + 1)]
-        return cls.argwhere(cls.is_invalid_discrete(df[cls.get_cols()], vals))
+        return cls.argwhere(cls.is_invalid_discrete(cls.get_items(df), vals))
+
+    @classmethod
+    def get_subscales(cls):
+        return {
+            'score_phyhea': [3, 4, 10, 15, 16, 17, 18],
+            'score_psy': [5, 6, 7, 11, 19, 26],
+            'score_socrel': [20, 21, 22],
+            'score_env': [8, 9, 12, 13, 14, 23, 24, 25]
+        }
+
+    @classmethod
+    def get_reverse_items(cls):
+        return [3, 4, 26]
 
     @classmethod
     def score(cls, df):
-        # reverse code for scoring
-        rev_cols = [3, 4, 26]
-        df = cls.reverse_code(df, rev_cols, cls.get_restr(), cls.get_min(), cls.get_max())
-
-        # score
-        phyhea = [3, 4, 10, 15, 16, 17, 18]
-        psy = [5, 6, 7, 11, 19, 26]
-        socrel = [20, 21, 22]
-        env = [8, 9, 12, 13, 14, 23, 24, 25]
-
-        scored = pd.DataFrame(
-            [],
-            columns=[f"{cls.get_prefix()}_{x}" for x in cls.get_score_suffixes()]
-        )
-        for score, cols in zip(scored.columns, [phyhea, psy, socrel, env]):
-            cols = cls.subset_cols_num(df.columns, cols, fr"{cls.get_prefix()}_(\d+)")
-            scored[score] = df[cols].sum(axis=1, skipna=False)
-        return scored
+        return cls.sum_subscales(df)
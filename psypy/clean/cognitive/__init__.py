@@ -1,8 +1,18 @@
-import os
-import importlib
-
-# Dynamically import all modules in the subpackage directory
-for module_name in os.listdir(os.path.dirname(__file__)):
-    if module_name.endswith(".py") and module_name != "__init__.py":
-        module_name = module_name[:-3]  # Remove the ".py" extension
-        importlib.import_module(f".{module_name}", package="psypy.clean.cognitive")
+from importlib import import_module
+
+from ._measures import MEASURES
+
+__all__ = list(MEASURES)
+
+
+def __getattr__(name):
+    # import the module of a measure on first use (see psypy.clean.registry)
+    if name in MEASURES:
+        return getattr(import_module(f".{MEASURES[name]}", __name__), name)
+    if name in MEASURES.values():
+        return import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted([*globals(), *MEASURES])
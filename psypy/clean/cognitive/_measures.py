@@ -0,0 +1,5 @@
+# generated by python -m psypy.clean.registry, do not edit
+MEASURES = {
+    'IntegNeuroCompatible': 'integneuro',
+    'WebNeuroCompatible': 'webneuro',
+}
@@ -1,5 +1,6 @@
 from ..measure import Measure
 from abc import abstractmethod
+import warnings
 import pandas as pd
 
 
@@ -13,6 +14,27 @@ class ParentNeuro(Measure):
         """
         pass
 
+    @classmethod
+    def compile_schema(cls):
+        schema = super().compile_schema()
+        # variable name -> column name
+        schema['var_cols'] = {k: f"{cls.get_prefix()}_{v}" for k, v in cls.get_var_mapping().items()}
+        return schema
+
+    @classmethod
+    def get_data_dict(cls):
+        """
+        float32 except for the reaction times score verifies
+        (float32 rounding of both sides of a small difference could be flagged as a discrepancy)
+        """
+        cols = cls.get_schema().var_cols
+        emotions = cls.get_emotions()
+        verified = [
+            cols['vcrtne2'], cols['vcrtne'], cols['vi_difrt'],
+            *[cols['dgtrt' + i] for i in emotions], *[cols['dgtcn' + i] for i in emotions[:-1]]
+        ]
+        return {**dict.fromkeys(cls.get_schema().cols, 'float32'), **dict.fromkeys(verified, 'float64')}
+
     @classmethod
     def get_emotions(cls):
         return "ADFHSN"
@@ -20,193 +42,117 @@ class ParentNeuro(Measure):
     @classmethod
     def is_invalid_digitsp(cls, ser):
         """
+        deprecated, digitsp is checked by get_range_rules
         :param ser: pd.Series for digitsp
         :return: pd.Series of dtype Bool for valid values
         """
-        return cls.is_invalid_discrete(ser, [i for i in range(3, 9 + 1)])
+        warnings.warn('is_invalid_digitsp is deprecated, see get_range_rules', DeprecationWarning, stacklevel=2)
+        return cls.is_invalid_int_range(ser, 3, 9)
 
     @classmethod
     def is_invalid_digitot(cls, ser):
         """
+        deprecated, digitot is checked by get_range_rules
         :param ser: pd.Series for digitot
         :return: pd.Series of dtype Bool for valid values
         """
-        return cls.is_invalid_discrete(ser, [i for i in range(0, 14 + 1)])
+        warnings.warn('is_invalid_digitot is deprecated, see get_range_rules', DeprecationWarning, stacklevel=2)
+        return cls.is_invalid_int_range(ser, 0, 14)
 
     @classmethod
     def is_invalid_perc(cls, df):
         """
+        deprecated, percent variables are checked by get_range_rules
         :param df: pd.Series or pd.DataFrame of percent variables
         :return: pd.Series or pd.DataFrame of dtype Bool for valid values
         """
-        return ~(((df <= 100) & (df >= 0)) | df.isna())
+        warnings.warn('is_invalid_perc is deprecated, see get_range_rules', DeprecationWarning, stacklevel=2)
+        frame = df.to_frame() if isinstance(df, pd.Series) else df
+        invalid = cls.evaluate_rules(frame, cls.compile_rules([(frame.columns, 'range', 0, 100)]))
+        return invalid.iloc[:, 0].rename(df.name) if isinstance(df, pd.Series) else invalid
 
     @classmethod
-    def check_range(cls, df):
+    def get_range_rules(cls):
         emotions = cls.get_emotions()
         var_mapping = cls.get_var_mapping()
-        idx = [
+
+        def cols(*names):
+            # called while compiling the schema so can not use schema var_cols
+            return [f"{cls.get_prefix()}_{var_mapping[i]}" for i in names]
+
+        return [
             # motor tapping
-            # check number of taps > 0
-            cls.argwhere(
-                ~((df[f"{cls.get_prefix()}_{var_mapping['tdomnk']}"] > 0)
-                  | (df[f"{cls.get_prefix()}_{var_mapping['tdomnk']}"].isna()))
-            ),
-            # check sd > 0
-            cls.argwhere(
-                ~((df[f"{cls.get_prefix()}_{var_mapping['tdomsdk']}"] > 0)
-                  | (df[f"{cls.get_prefix()}_{var_mapping['tdomsdk']}"].isna()))
-            ),
+            # check number of taps > 0, sd > 0
+            (cols('tdomnk', 'tdomsdk'), '>', 0),
 
             # choice reaction
             # check rt > 0
-            cls.argwhere(
-                ~((df[f"{cls.get_prefix()}_{var_mapping['chlrrtav']}"] > 0)
-                  | (df[f"{cls.get_prefix()}_{var_mapping['chlrrtav']}"].isna()))
-            ),
+            (cols('chlrrtav'), '>', 0),
 
             # verbal recall
             # recalled >= 0
-            cls.argwhere(
-                ~((df[f"{cls.get_prefix()}_{var_mapping['ctmsco13']}"] >= 0)
-                  | (df[f"{cls.get_prefix()}_{var_mapping['ctmsco13']}"].isna()))
-            ),
+            (cols('ctmsco13'), '>=', 0),
 
             # explicit emotion
-            # check accuracy
-            cls.argwhere(
-                cls.is_invalid_perc(df[[f"{cls.get_prefix()}_{var_mapping['getcp' + i]}" for i in emotions]])
-            ),
+            # check accuracy (percent)
+            (cols(*['getcp' + i for i in emotions]), 'range', 0, 100),
             # check rt > 0
-            cls.argwhere(
-                ~((df[[f"{cls.get_prefix()}_{var_mapping['getrt' + i]}" for i in emotions]] > 0)
-                  | (df[[f"{cls.get_prefix()}_{var_mapping['getrt' + i]}" for i in emotions]].isna()))
-            ),
+            (cols(*['getrt' + i for i in emotions]), '>', 0),
 
             # digit span
             # check span range
-            cls.argwhere(cls.is_invalid_digitsp(df[f"{cls.get_prefix()}_{var_mapping['digitsp']}"])),
+            (cols('digitsp'), 'int', 3, 9),
             # check total range
-            cls.argwhere(cls.is_invalid_digitot(df[f"{cls.get_prefix()}_{var_mapping['digitot']}"])),
+            (cols('digitot'), 'int', 0, 14),
 
             # verbal interference
             # check rt > 0
-            cls.argwhere(
-                ~((df[[f"{cls.get_prefix()}_{var_mapping['vcrtne' + i]}" for i in ['', '2']]] > 0)
-                  | (df[[f"{cls.get_prefix()}_{var_mapping['vcrtne' + i]}" for i in ['', '2']]].isna()))
-            ),
-            # check score >= 0
-            cls.argwhere(
-                ~((df[[f"{cls.get_prefix()}_{var_mapping['vi_sco' + str(i)]}" for i in [1, 2]]] >= 0)
-                  | (df[[f"{cls.get_prefix()}_{var_mapping['vi_sco' + str(i)]}" for i in [1, 2]]].isna()))
-            ),
-            # check err >= 0
-            cls.argwhere(
-                ~((df[[f"{cls.get_prefix()}_{var_mapping['vi_err' + str(i)]}" for i in [1, 2]]] >= 0)
-                  | (df[[f"{cls.get_prefix()}_{var_mapping['vi_err' + str(i)]}" for i in [1, 2]]].isna()))
-            ),
+            (cols('vcrtne', 'vcrtne2'), '>', 0),
+            # check score >= 0, err >= 0
+            (cols('vi_sco1', 'vi_sco2', 'vi_err1', 'vi_err2'), '>=', 0),
 
             # switching of attention
-            # connection time > 0
-            cls.argwhere(
-                ~((df[[f"{cls.get_prefix()}_{var_mapping['scavr0t' + str(i)]}" for i in [1, 2]]] > 0)
-                  | (df[[f"{cls.get_prefix()}_{var_mapping['scavr0t' + str(i)]}" for i in [1, 2]]].isna()))
-            ),
-            # duration > 0
-            cls.argwhere(
-                ~((df[[f"{cls.get_prefix()}_{var_mapping['esoadur' + str(i)]}" for i in [1, 2]]] > 0)
-                  | (df[[f"{cls.get_prefix()}_{var_mapping['esoadur' + str(i)]}" for i in [1, 2]]].isna()))
-            ),
+            # connection time > 0, duration > 0
+            (cols('scavr0t1', 'scavr0t2', 'esoadur1', 'esoadur2'), '>', 0),
             # 0 <= errors <= 25
-            cls.argwhere(
-                ~(((df[[f"{cls.get_prefix()}_{var_mapping['esoaerr' + str(i)]}" for i in [1, 2]]] >= 0)
-                   & (df[[f"{cls.get_prefix()}_{var_mapping['esoaerr' + str(i)]}" for i in [1, 2]]] <= 25))
-                  | (df[[f"{cls.get_prefix()}_{var_mapping['esoaerr' + str(i)]}" for i in [1, 2]]].isna()))
-            ),
+            (cols('esoaerr1', 'esoaerr2'), 'range', 0, 25),
 
             # go no go
-            # rt > 0
-            cls.argwhere(
-                ~((df[f"{cls.get_prefix()}_{var_mapping['g2avrtk']}"] > 0)
-                  | (df[f"{cls.get_prefix()}_{var_mapping['g2avrtk']}"].isna()))
-            ),
+            # rt > 0, sd > 0
+            (cols('g2avrtk', 'g2sdrtk'), '>', 0),
             # fp, fn >= 0
-            cls.argwhere(
-                ~((df[[f"{cls.get_prefix()}_{var_mapping[i]}" for i in ['g2fnk', 'g2fpk']]] >= 0)
-                  | (df[[f"{cls.get_prefix()}_{var_mapping[i]}" for i in ['g2fnk', 'g2fpk']]].isna()))
-            ),
-            # sd > 0
-            cls.argwhere(
-                ~((df[f"{cls.get_prefix()}_{var_mapping['g2sdrtk']}"] > 0)
-                  | (df[f"{cls.get_prefix()}_{var_mapping['g2sdrtk']}"].isna()))
-            ),
+            (cols('g2fnk', 'g2fpk'), '>=', 0),
 
             # delayed recall
             # recalled >= 0
-            cls.argwhere(
-                ~((df[f"{cls.get_prefix()}_{var_mapping['ctmrec4']}"] >= 0)
-                  | (df[f"{cls.get_prefix()}_{var_mapping['ctmrec4']}"].isna()))
-            ),
+            (cols('ctmrec4'), '>=', 0),
 
             # implicit emotion
             # rt > 0
-            cls.argwhere(
-                ~((df[[f"{cls.get_prefix()}_{var_mapping['dgtrt' + i]}" for i in emotions]] > 0)
-                  | (df[[f"{cls.get_prefix()}_{var_mapping['dgtrt' + i]}" for i in emotions]].isna()))
-            ),
+            (cols(*['dgtrt' + i for i in emotions]), '>', 0),
 
             # working memory
             # fn, fp >= 0
-            cls.argwhere(
-                ~((df[[f"{cls.get_prefix()}_{var_mapping[i]}" for i in ['wmfnk', 'wmfpk']]] >= 0)
-                  | (df[[f"{cls.get_prefix()}_{var_mapping[i]}" for i in ['wmfnk', 'wmfpk']]].isna()))
-            ),
+            (cols('wmfnk', 'wmfpk'), '>=', 0),
             # rt > 0
-            cls.argwhere(
-                ~((df[f"{cls.get_prefix()}_{var_mapping['wmrtk']}"] > 0)
-                  | (df[f"{cls.get_prefix()}_{var_mapping['wmrtk']}"].isna()))
-            ),
+            (cols('wmrtk'), '>', 0),
 
             # maze
-            # comp time > 0
-            cls.argwhere(
-                ~((df[f"{cls.get_prefix()}_{var_mapping['emzcompk']}"] > 0)
-                  | (df[f"{cls.get_prefix()}_{var_mapping['emzcompk']}"].isna()))
-            ),
-            # init time > 0
-            cls.argwhere(
-                ~((df[f"{cls.get_prefix()}_{var_mapping['emzinitk']}"] > 0)
-                  | (df[f"{cls.get_prefix()}_{var_mapping['emzinitk']}"].isna()))
-            ),
-            # over >= 0
-            cls.argwhere(
-                ~((df[f"{cls.get_prefix()}_{var_mapping['emzoverk']}"] >= 0)
-                  | (df[f"{cls.get_prefix()}_{var_mapping['emzoverk']}"].isna()))
-            ),
-            # err >= 0
-            cls.argwhere(
-                ~((df[f"{cls.get_prefix()}_{var_mapping['emzerrk']}"] >= 0)
-                  | (df[f"{cls.get_prefix()}_{var_mapping['emzerrk']}"].isna()))
-            ),
+            # comp time > 0, init time > 0
+            (cols('emzcompk', 'emzinitk'), '>', 0),
+            # over >= 0, err >= 0
+            (cols('emzoverk', 'emzerrk'), '>=', 0),
             # trials >= 2
-            cls.argwhere(
-                ~((df[f"{cls.get_prefix()}_{var_mapping['emztrlsk']}"] >= 2)
-                  | (df[f"{cls.get_prefix()}_{var_mapping['emztrlsk']}"].isna()))
-            ),
+            (cols('emztrlsk'), '>=', 2),
             # maze comp time > maze init time
-            cls.argwhere(~((df[f"{cls.get_prefix()}_{var_mapping['emzcompk']}"]
-                            >= df[f"{cls.get_prefix()}_{var_mapping['emzinitk']}"]) |
-                           df[[f"{cls.get_prefix()}_{var_mapping['emzcompk']}",
-                               f"{cls.get_prefix()}_{var_mapping['emzinitk']}"]].isna().any(axis=1))
-                         .rename(f"{cls.get_prefix()}_{var_mapping['emzcompk']}")),
+            (cols('emzcompk'), '>=col', *cols('emzinitk')),
             # emzerr > emzover
-            cls.argwhere(~((df[f"{cls.get_prefix()}_{var_mapping['emzerrk']}"]
-                           >= df[f"{cls.get_prefix()}_{var_mapping['emzoverk']}"]) |
-                           df[[f"{cls.get_prefix()}_{var_mapping['emzerrk']}",
-                               f"{cls.get_prefix()}_{var_mapping['emzoverk']}"]].isna().any(axis=1))
-                         .rename(f"{cls.get_prefix()}_{var_mapping['emzerrk']}")),
+            (cols('emzerrk'), '>=col', *cols('emzoverk')),
         ]
-        return pd.concat(idx, axis=0)
+
+    @classmethod
+    def check_range(cls, df):
+        return cls.argwhere(cls.get_invalid_mask(df))
 
     @classmethod
     def score(cls, df):
@@ -216,24 +162,18 @@ class ParentNeuro(Measure):
         :return: pd.DataFrame of scored summary variables
         """
         emotions = cls.get_emotions()
-        var_mapping = cls.get_var_mapping()
+        cols = cls.get_schema().var_cols
         scores = [
             # verbal interference
-            (df[f"{cls.get_prefix()}_{var_mapping['vcrtne2']}"] - df[f"{cls.get_prefix()}_{var_mapping['vcrtne']}"]) \
-                .rename(f"{cls.get_prefix()}_{var_mapping['vi_difrt']}"),
+            (df[cols['vcrtne2']] - df[cols['vcrtne']]).rename(cols['vi_difrt']),
             # go no go
-            df[[f"{cls.get_prefix()}_{var_mapping['g2' + i + 'k']}" for i in ['fn', 'fp']]].sum(axis=1, skipna=False) \
-                .rename(f"{cls.get_prefix()}_{var_mapping['g2errk']}"),
+            df[[cols['g2fnk'], cols['g2fpk']]].sum(axis=1, skipna=False).rename(cols['g2errk']),
             # implicit emotion
-            (df[[f"{cls.get_prefix()}_{var_mapping['dgtrt' + i]}" for i in emotions[:-1]]].apply(
-                lambda s: s - df[f"{cls.get_prefix()}_{var_mapping['dgtrtN']}"]
-            )).rename(columns={
-                f"{cls.get_prefix()}_{var_mapping['dgtrt' + i]}": f"{cls.get_prefix()}_{var_mapping['dgtcn' + i]}"
-                for i in emotions[:-1]
+            df[[cols['dgtrt' + i] for i in emotions[:-1]]].sub(df[cols['dgtrtN']], axis=0).rename(columns={
+                cols['dgtrt' + i]: cols['dgtcn' + i] for i in emotions[:-1]
             }),
             # working memory
-            df[[f"{cls.get_prefix()}_{var_mapping['wm' + i + 'k']}" for i in ['fn', 'fp']]].sum(axis=1, skipna=False) \
-                .rename(f"{cls.get_prefix()}_{var_mapping['wmacck']}"),
+            df[[cols['wmfnk'], cols['wmfpk']]].sum(axis=1, skipna=False).rename(cols['wmacck']),
         ]
         scores = pd.concat(scores, axis=1)
         return scores
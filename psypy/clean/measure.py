@@ -1,16 +1,130 @@
+import hashlib
+import json
 import os
+import sys
 from abc import ABC, abstractmethod
 import numpy as np
 import pandas as pd
 
+from .profiling import NoProfiler
+from .store import load_store, write_store
+
 
 class ExceptionWithData(Exception):
     def __init__(self, message, data):
         super().__init__(message)
         self.data = data
 
+    def __reduce__(self):
+        # keep data when raised in a worker process
+        return self.__class__, (*self.args, self.data)
+
+
+# output formats for Base.save: file extension and function writing df to path
+WRITERS = {
+    'csv': ('csv', lambda df, path: df.to_csv(path)),
+    'csv.gz': ('csv.gz', lambda df, path: df.to_csv(path, compression='gzip')),
+    'parquet': ('parquet', lambda df, path: df.to_parquet(path)),
+    # feather does not store the index
+    'feather': ('feather', lambda df, path: df.reset_index().to_feather(path)),
+    # directory of memory mapped columns (see store.py)
+    'store': ('store', write_store),
+}
+
+
+class ChunkWriter:
+    """
+    appends cleaned chunks to one output file, for the formats of WRITERS that can be written in parts
+    """
+    FORMATS = ['csv', 'csv.gz', 'parquet']
+
+    def __init__(self, path, output_format):
+        """
+        :param path: path of the output file
+        :param output_format: one of FORMATS
+        """
+        if output_format not in self.FORMATS:
+            raise ValueError(f"Output format '{output_format}' can not be written in chunks")
+        self.path = path
+        self.output_format = output_format
+        self.writer = None
+        self.started = False
+        self.empty = None
+
+    def write(self, df):
+        """
+        appends df, the first chunk creates the file
+        :param df: DataFrame of cleaned data
+        """
+        if self.output_format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if len(df) == 0:
+                # the schema is taken from the first non empty chunk (columns of an empty one have no type)
+                self.empty = df
+                return
+            # integer columns become float once a later chunk has masked values, so all are written as float
+            df = df.astype({col: float for col, dtype in df.dtypes.items() if isinstance(dtype, np.dtype)
+                            and dtype.kind in 'iu'})
+            table = pa.Table.from_pandas(df, schema=None if self.writer is None else self.writer.schema)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode='a' if self.started else 'w', header=not self.started,
+                      compression='gzip' if self.output_format == 'csv.gz' else None)
+        self.started = True
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        elif self.empty is not None:
+            self.empty.to_parquet(self.path)
+
+
+class Schema:
+    """
+    metadata of a measure compiled once per class (see Base.get_schema)
+    """
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
 
 class Base(ABC):
+    # rows evaluated at once by evaluate_rules and sum_subscales
+    BLOCK_ROWS = 4096
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # each class gets its own schema, compiled on first use since abstract classes can not be compiled
+        cls._schema = None
+
+    @classmethod
+    def get_schema(cls):
+        """
+        :return: Schema of the class
+        """
+        if cls._schema is None:
+            cls._schema = Schema(**cls.compile_schema())
+        return cls._schema
+
+    @classmethod
+    def compile_schema(cls):
+        """
+        compiles metadata read by hot paths instead of rebuilding lists on every call
+        override to add to it
+        :return: dict of metadata
+        """
+        cols = pd.Index(cls.get_cols())
+        return {
+            'cols': cols,
+            'score_cols': pd.Index([]),
+            'range_rules': cls.compile_range_rules(),
+            # item number of each column (nan if none) so reverse coding does not parse column names
+            'item_nums': cols.str.extract(cls.get_restr())[0].astype(float).to_numpy()
+        }
+
     @classmethod
     @abstractmethod
     def get_prefix(cls):
@@ -31,13 +145,160 @@ class Base(ABC):
         """
         pass
 
+    @classmethod
+    def get_invalid_mask(cls, df):
+        """
+        checks range and returns mask of invalid values
+        override to build the mask directly instead of going through check_range
+        :param df: DataFrame of data
+        :return: pd.DataFrame of dtype Bool aligned to df, True where invalid
+        """
+        if cls.get_schema().range_rules is not None:
+            return cls.is_invalid_rules(df)
+        return cls.report_to_mask(df, cls.check_range(df))
+
+    @classmethod
+    def check_invalid(cls, df):
+        """
+        builds the mask and the report of invalid values once each
+        from the mask when the class builds it directly (range rules or get_invalid_mask overridden),
+        otherwise from the report of check_range
+        :param df: DataFrame of data
+        :return: tuple of mask (see get_invalid_mask) and report (see check_range)
+        """
+        if cls.get_schema().range_rules is None and cls.get_invalid_mask.__func__ is Base.get_invalid_mask.__func__:
+            idx = cls.check_range(df)
+            return cls.report_to_mask(df, idx), idx
+        mask = cls.get_invalid_mask(df)
+        return mask, cls.argwhere(mask)
+
+    @classmethod
+    def get_range_rules(cls):
+        """
+        declares valid ranges as rules to be evaluated by is_invalid_rules
+        each rule is a tuple (columns, op, *args) where op is one of
+        '>' or '>=' (lower bound), 'range' (inclusive lo, hi), 'int' (integer within inclusive lo, hi),
+        '>=col' (column must be >= other column; violations reported on the left column)
+        :return: list of rules or None if check_range is implemented directly
+        """
+        return None
+
+    @classmethod
+    def compile_range_rules(cls):
+        """
+        compiles range rules into per-column bound arrays (see get_schema for the cached version)
+        :return: dict of compiled rules or None if class has no rules
+        """
+        rules = cls.get_range_rules()
+        return None if rules is None else Base.compile_rules(rules)
+
+    @staticmethod
+    def compile_rules(rules):
+        """
+        compiles range rules (see get_range_rules) into per-column bound arrays
+        :param rules: list of rules
+        :return: dict of compiled rules
+        """
+        bounds = {}
+        cross = []
+
+        def get_bound(col):
+            return bounds.setdefault(col, [-np.inf, False, np.inf, False, False])
+
+        for cols, op, *args in rules:
+            for col in cols:
+                bound = get_bound(col)
+                if op in ('>', '>='):
+                    if args[0] >= bound[0]:
+                        bound[0], bound[1] = args[0], op == '>' or (args[0] == bound[0] and bound[1])
+                elif op in ('range', 'int'):
+                    if args[0] >= bound[0]:
+                        bound[0], bound[1] = args[0], args[0] == bound[0] and bound[1]
+                    if args[1] <= bound[2]:
+                        bound[2], bound[3] = args[1], args[1] == bound[2] and bound[3]
+                    bound[4] = bound[4] or op == 'int'
+                elif op == '>=col':
+                    get_bound(args[0])
+                    cross.append((col, args[0]))
+                else:
+                    raise ValueError(f"Invalid range rule '{op}'")
+
+        cols = pd.Index(bounds.keys())
+        lo, lo_strict, hi, hi_strict, integer = (np.array(x) for x in (zip(*bounds.values()) if bounds else [[]] * 5))
+        return {
+            'cols': cols,
+            'lo': lo,
+            'lo_strict': lo_strict,
+            'hi': hi,
+            'hi_strict': hi_strict,
+            'integer': integer,
+            'cross_a': cols.get_indexer([a for a, _ in cross]),
+            'cross_b': cols.get_indexer([b for _, b in cross]),
+        }
+
+    @classmethod
+    def is_invalid_rules(cls, df):
+        """
+        evaluates the compiled range rules of the class (see evaluate_rules)
+        :param df: DataFrame of data
+        :return: pd.DataFrame of dtype Bool aligned to df, True where invalid
+        """
+        return Base.evaluate_rules(df, cls.get_schema().range_rules)
+
+    @staticmethod
+    def evaluate_rules(df, rules):
+        """
+        evaluates compiled range rules as one comparison over the column block
+        :param df: DataFrame of data
+        :param rules: dict returned by compile_rules
+        :return: pd.DataFrame of dtype Bool aligned to df, True where invalid
+        """
+        # only select the ruled columns when df has others
+        ruled = df if df.columns.equals(rules['cols']) else df[rules['cols']]
+        invalid = np.empty(ruled.shape, dtype=bool)
+        # bounds shared by all columns are compared as scalars and terms no column uses are skipped
+        lo, lo_strict, hi, hi_strict, integer = (
+            rules[x][0].item() if len(rules[x]) and (rules[x] == rules[x][0]).all() else rules[x]
+            for x in ['lo', 'lo_strict', 'hi', 'hi_strict', 'integer']
+        )
+        # evaluate in row blocks so the float copy and temporaries stay small
+        for start in range(0, len(ruled), Base.BLOCK_ROWS):
+            block = ruled.iloc[start:start + Base.BLOCK_ROWS].to_numpy(dtype=float, na_value=np.nan)
+            with np.errstate(invalid='ignore'):
+                out = (block < lo) | (block > hi)
+                for flag, term in [(lo_strict, lambda: block == lo), (hi_strict, lambda: block == hi),
+                                   (integer, lambda: block != np.floor(block))]:
+                    if flag is True:
+                        out |= term()
+                    elif flag is not False:
+                        out |= flag & term()
+            out &= ~np.isnan(block)
+            if len(rules['cross_a']):
+                # comparisons against nan are False, so missing on either side is valid
+                with np.errstate(invalid='ignore'):
+                    cross = block[:, rules['cross_a']] < block[:, rules['cross_b']]
+                for i, pos in enumerate(rules['cross_a']):
+                    out[:, pos] |= cross[:, i]
+            invalid[start:start + Base.BLOCK_ROWS] = out
+
+        if ruled is df:
+            return pd.DataFrame(invalid, index=df.index, columns=df.columns)
+        mask = np.zeros(df.shape, dtype=bool)
+        mask[:, df.columns.get_indexer(rules['cols'])] = invalid
+        return pd.DataFrame(mask, index=df.index, columns=df.columns)
+
     @classmethod
     def get_data_dict(cls):
-        # TODO
-        pass
+        """
+        declares the dtype each column is read with (see pipeline.read_measures)
+        override with smaller dtypes where values allow it
+        :return: dict mapping column to dtype
+        """
+        return dict.fromkeys(cls.get_schema().cols, 'float64')
 
     @classmethod
-    def process(cls, df, output_path, calc_age=None, mapping=None, to_na=True, rev_code=False, **kwargs):
+    def process(cls, df, output_path, calc_age=None, mapping=None, to_na=True, rev_code=False, output_format='csv',
+                **kwargs):
         """
         :param df: DataFrame of data
         :param output_path: output path
@@ -45,86 +306,379 @@ class Base(ABC):
         :param mapping: dict mapping df column names to expected measure column names
         :param to_na: bool whether to convert invalid values to np.nan
         :param rev_code: bool whether to reverse code
+        :param output_format: one of WRITERS ('csv', 'csv.gz', 'parquet', 'feather', 'store')
+        :param profiler: profiling.Profiler to collect per stage timing and memory
+        :param compact: bool whether to cast validated integer items to small nullable integer dtypes
        """
-        df = df.copy()
+        df = cls.prepare(df, calc_age=calc_age, mapping=mapping, **kwargs)
+        df, _ = cls.clean(df, to_na=to_na, rev_code=rev_code, **kwargs)
+
+        # save df
+        if output_path is not None:
+            with kwargs.get('profiler', NoProfiler()).stage(cls, 'save', lambda: df):
+                cls.save(df, output_path, output_format=output_format)
+        return df
+
+    @classmethod
+    def process_chunked(cls, path, output_path, chunksize=100000, calc_age=None, mapping=None, to_na=True,
+                        rev_code=False, output_format='csv', **kwargs):
+        """
+        processes a file too large for memory in row chunks, appending each cleaned chunk to the output
+        :param path: path to .csv or .parquet file with ID, SES, AGE columns
+        :param output_path: output path (nothing is written if None)
+        :param chunksize: number of rows per chunk
+        :param output_format: one of ChunkWriter.FORMATS ('csv', 'csv.gz', 'parquet')
+        (other params same as process)
+        :return: pd.DataFrame of indices of invalid values across all chunks
+        """
+        if calc_age is not None:
+            # dob and session dates may be on different rows (chunks) than the data, so get them up front
+            age_cols = [kwargs['dob_col']]
+            if isinstance(kwargs['date_col'], dict):
+                age_cols += list(kwargs['date_col'].values())
+            inverse = {v: k for k, v in (mapping or {}).items()}
+            age_cols = [*cls.get_index(), *[inverse.get(x, x) for x in age_cols]]
+            ages = pd.concat(cls.read_chunks(path, chunksize, age_cols))
+            if mapping:
+                ages = ages.rename(columns=mapping)
+            kwargs['dob'] = cls.get_dob(ages, kwargs['dob_col'])
+            if isinstance(kwargs['date_col'], dict):
+                kwargs['dates'] = cls.get_session_dates(ages, kwargs['date_col'])
+            del ages
+
+        profiler = kwargs.get('profiler', NoProfiler())
+        writer = None
+        if output_path is not None:
+            if output_format not in WRITERS:
+                raise ValueError("Invalid 'output_format' argument")
+            extension = WRITERS[output_format][0]
+            writer = ChunkWriter(os.path.join(output_path, f"{cls.get_prefix()}.{extension}"), output_format)
+        idx = []
+        try:
+            for chunk in cls.read_chunks(path, chunksize):
+                # all steps after age calculation are row-wise so are safe to apply per chunk
+                chunk = cls.prepare(chunk, calc_age=calc_age, mapping=mapping, **kwargs)
+                chunk, chunk_idx = cls.clean(chunk, to_na=to_na, rev_code=rev_code, **kwargs)
+                if writer is not None:
+                    with profiler.stage(cls, 'save', lambda: chunk):
+                        writer.write(chunk)
+                idx.append(chunk_idx)
+        finally:
+            if writer is not None:
+                writer.close()
+        if len(idx) == 0:
+            # empty input, nothing is written
+            return pd.DataFrame({'index': [], 'column': []})
+        return pd.concat(idx, axis=0, ignore_index=True)
+
+    @classmethod
+    def process_incremental(cls, df, output_path, calc_age=None, mapping=None, to_na=True, rev_code=False,
+                            output_format='csv', **kwargs):
+        """
+        processes only rows that are new or changed since the last run, reusing cached cleaned rows for the rest
+        rows are keyed on ID and SES and compared by a hash of their relevant columns and age
+        the cache ({prefix}.cache directory of parquet files, requires pyarrow) is kept in output_path next to the output
+        and rebuilt when options or the cleaning code (see get_fingerprint) change
+        (params same as process)
+        :return: DataFrame of cleaned data for all rows, same as process
+        """
+        df = cls.prepare(df, calc_age=calc_age, mapping=mapping, **kwargs)
+        profiler = kwargs.get('profiler', NoProfiler())
+        options = {'to_na': to_na, 'rev_code': rev_code, 'col_num': sorted(kwargs.get('col_num') or []),
+                   'keep': kwargs.get('keep'), 'compact': bool(kwargs.get('compact')),
+                   'fingerprint': cls.get_fingerprint()}
+
+        key = df.index.droplevel('AGE')
+        if key.has_duplicates:
+            raise ValueError('Incremental processing requires unique ID and SES')
+        with profiler.stage(cls, 'hash', lambda: df):
+            rows = cls.subset_relevant_cols(df)
+            # hash numbers as floats so an int column turning float (e.g. on a new missing value) keeps its hashes
+            rows = rows.astype(dict.fromkeys(rows.select_dtypes('number').columns, float))
+            hashes = pd.util.hash_pandas_object(rows, index=True).to_numpy()
+            del rows
+
+        cache_path = os.path.join(output_path, f"{cls.get_prefix()}.cache")
+        cache = cls.read_cache(cache_path, options)
+        if cache is None:
+            cache = {'options': options, 'key': key[:0], 'hashes': hashes[:0], 'data': None}
+        pos = cache['key'].get_indexer(key)
+        same = pos >= 0
+        same[same] = cache['hashes'][pos[same]] == hashes[same]
+
+        parts = []
+        if cache['data'] is not None:
+            # cleaned rows of unchanged keys, rows removed from df are dropped here
+            cached = cache['data']
+            parts.append(cached[cached.index.droplevel('AGE').isin(key[same])])
+        if not parts or not same.all():
+            cleaned, _ = cls.clean(df[~same], to_na=to_na, rev_code=rev_code, **kwargs)
+            parts.append(cleaned)
+
+        with profiler.stage(cls, 'merge', lambda: df):
+            df = pd.concat(parts, axis=0) if len(parts) > 1 else parts[0]
+            # same row order as the input
+            df = df.iloc[np.argsort(key.get_indexer(df.index.droplevel('AGE')), kind='stable')]
+
+        with profiler.stage(cls, 'save', lambda: df):
+            cls.save(df, output_path, output_format=output_format)
+            cls.write_cache(cache_path, {'options': options, 'key': key, 'hashes': hashes, 'data': df})
+        return df
+
+    @classmethod
+    def get_fingerprint(cls):
+        """
+        hash of the pandas version and of the source of the modules defining the class and its measure bases
+        so cached cleaned rows are not reused after the cleaning code changes
+        :return: str
+        """
+        fingerprint = hashlib.sha256(pd.__version__.encode())
+        for module in sorted({x.__module__ for x in cls.__mro__ if issubclass(x, Base)}):
+            with open(sys.modules[module].__file__, 'rb') as f:
+                fingerprint.update(f.read())
+        return fingerprint.hexdigest()
+
+    @staticmethod
+    def read_cache(path, options):
+        """
+        reads a cache written by write_cache
+        :param path: cache directory
+        :param options: dict of options the cache has to be written with
+        :return: dict with options, key, hashes and data or None if there is no cache for these options
+        """
+        import pyarrow.parquet as pq
+        keys_path = os.path.join(path, 'keys.parquet')
+        if not os.path.exists(keys_path):
+            return None
+        metadata = pq.read_schema(keys_path).metadata or {}
+        if metadata.get(b'psypy_options') != json.dumps(options, sort_keys=True).encode():
+            return None
+        keys = pd.read_parquet(keys_path)
+        return {
+            'options': options,
+            'key': pd.MultiIndex.from_frame(keys[['ID', 'SES']]),
+            'hashes': keys['hash'].to_numpy(),
+            'data': pd.read_parquet(os.path.join(path, 'data.parquet'))
+        }
+
+    @staticmethod
+    def write_cache(path, cache):
+        """
+        writes the keys and hashes of the input rows, with the options in the file metadata, and the cleaned data
+        :param path: cache directory
+        :param cache: dict with options, key, hashes and data
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        os.makedirs(path, exist_ok=True)
+        keys = cache['key'].to_frame(index=False)
+        keys['hash'] = cache['hashes']
+        table = pa.Table.from_pandas(keys, preserve_index=False)
+        options = json.dumps(cache['options'], sort_keys=True).encode()
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'psypy_options': options})
+        keys_path = os.path.join(path, 'keys.parquet')
+        # keys are removed first and written last so an interrupted write leaves no keys pointing at other data
+        if os.path.exists(keys_path):
+            os.remove(keys_path)
+        cache['data'].to_parquet(os.path.join(path, 'data.parquet'))
+        pq.write_table(table, keys_path)
+
+    @classmethod
+    def read_chunks(cls, path, chunksize, columns=None):
+        """
+        reads a .csv or .parquet file in row chunks
+        :param path: path to file with ID, SES, AGE columns
+        :param chunksize: number of rows per chunk
+        :param columns: list of columns to read (all if None)
+        :return: generator of DataFrames indexed by ID, SES, AGE
+        """
+        if path.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            chunks = (batch.to_pandas() for batch in
+                      pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns))
+        else:
+            try:
+                chunks = pd.read_csv(path, chunksize=chunksize, usecols=columns)
+            except pd.errors.EmptyDataError:
+                # file without even a header has no chunks
+                return
+        for chunk in chunks:
+            if list(chunk.index.names) != list(cls.get_index()):
+                chunk = chunk.set_index(list(cls.get_index()))
+            yield chunk
+
+    @classmethod
+    def prepare(cls, df, calc_age=None, mapping=None, **kwargs):
+        """
+        validates index, renames columns and calculates age
+        does not depend on the measure so can be shared across measures (see process for parameters)
+        :param df: DataFrame of data
+        :return: shallow copy of df ready for clean (the data itself is only copied by clean)
+        """
+        profiler = kwargs.get('profiler', NoProfiler())
+        with profiler.stage(cls, 'copy', lambda: df):
+            df = df.copy(deep=False)
         # make sure index is in expected format
         if not (cls.get_index() == df.index.names).all():
             raise ValueError('Index names not expected')
         # rename columns to match expected
         if mapping:
-            df = df.rename(columns=mapping)
+            with profiler.stage(cls, 'rename', lambda: df):
+                df.columns = [mapping.get(col, col) for col in df.columns]
 
         if calc_age is not None:
-            if 'format' in kwargs:
-                df = cls.calculate_age(df, how=calc_age, dob_col=kwargs['dob_col'],
-                                       date_col=kwargs['date_col'], format=kwargs['format'])
-            else:
-                df = cls.calculate_age(df, how=calc_age, dob_col=kwargs['dob_col'], date_col=kwargs['date_col'])
+            with profiler.stage(cls, 'calculate_age', lambda: df):
+                df = cls.calculate_age(df, how=calc_age, dob_col=kwargs['dob_col'], date_col=kwargs['date_col'],
+                                       **{k: kwargs[k] for k in ['format', 'dob', 'dates'] if k in kwargs})
+        return df
 
-        # subset to relevant columns
-        df = cls.subset_relevant_cols(df)
+    @classmethod
+    def clean(cls, df, to_na=True, rev_code=False, **kwargs):
+        """
+        subsets, checks range, scores and reorders the measure (see process for parameters)
+        :param df: DataFrame of data returned by prepare
+        :return: tuple of cleaned DataFrame and pd.DataFrame of indices of invalid values
+        """
+        profiler = kwargs.get('profiler', NoProfiler())
+
+        # subset to relevant columns, this is the only full copy of the data so later steps work in place
+        with profiler.stage(cls, 'subset', lambda: df):
+            df = cls.subset_relevant_cols(df)
 
         # drop all NaNs
-        df = df[~df.isna().all(axis=1)]
+        with profiler.stage(cls, 'drop_na', lambda: df):
+            keep = df.notna().any(axis=1).to_numpy()
+            if not keep.all():
+                df = df[keep]
 
         assert not df.columns.duplicated().any()
         # check if any outside of range
-        idx = cls.check_range(df)
-        idx = idx.drop_duplicates()
+        with profiler.stage(cls, 'check_range', lambda: idx):
+            mask, idx = cls.check_invalid(df)
         # convert or raise
         if to_na == 'ignore':
             pass
         elif to_na:
-            for _, row in idx.iterrows():
-                df.loc[row['index'], row['column']] = np.nan
+            with profiler.stage(cls, 'to_na', lambda: df):
+                df.mask(mask, inplace=True)
         elif len(idx) > 0:
             raise ExceptionWithData('Invalid range', idx)
 
+        # cast items to compact dtypes
+        if kwargs.get('compact'):
+            with profiler.stage(cls, 'compact', lambda: df):
+                df = cls.downcast(df, cls.get_schema().cols)
+
+        # encode validated strings as categoricals
+        with profiler.stage(cls, 'encode', lambda: df):
+            df = cls.encode(df)
+
         # reverse code
         if rev_code:
-            df = cls.reverse_code(df, kwargs['col_num'], cls.get_restr(), cls.get_min(), cls.get_max())
+            with profiler.stage(cls, 'reverse_code', lambda: df):
+                df = cls.reverse_items(df, kwargs['col_num'], cls.get_min(), cls.get_max())
 
         # score
-        if 'keep' in kwargs:
-            df = cls.score_if_needed(df, keep=kwargs['keep'])
-        else:
-            df = cls.score_if_needed(df, keep=None)
+        df = cls.score_if_needed(df, keep=kwargs.get('keep'), profiler=profiler)
 
         # check
         assert df.columns.str.match(fr"^{cls.get_prefix()}_.+$").all()
         assert not df.columns.duplicated().any()
 
         # reorder
-        df = cls.reorder(df)
+        with profiler.stage(cls, 'reorder', lambda: df):
+            df = cls.reorder(df)
 
         # make age int
-        df = df.reset_index()
-        df['AGE'] = df['AGE'].apply(lambda x: np.floor(x))
-        df = df.set_index(['ID', 'SES', 'AGE'])
+        with profiler.stage(cls, 'floor_age', lambda: df):
+            df.index = pd.MultiIndex.from_arrays([
+                df.index.get_level_values('ID'),
+                df.index.get_level_values('SES'),
+                np.floor(df.index.get_level_values('AGE').to_numpy(dtype=float))
+            ], names=['ID', 'SES', 'AGE'])
+        return df, idx
 
-        # save df
-        if output_path is not None:
-            df.to_csv(os.path.join(output_path, f"{cls.get_prefix()}.csv"))
+    @classmethod
+    def save(cls, df, output_path, output_format='csv'):
+        """
+        saves cleaned data as {prefix}.{extension}
+        parquet and feather (require pyarrow) and store keep dtypes such as categoricals
+        :param df: DataFrame of cleaned data
+        :param output_path: output path
+        :param output_format: one of WRITERS
+        """
+        if output_format not in WRITERS:
+            raise ValueError("Invalid 'output_format' argument")
+        extension, writer = WRITERS[output_format]
+        writer(df, os.path.join(output_path, f"{cls.get_prefix()}.{extension}"))
+
+    @classmethod
+    def load(cls, path, columns=None):
+        """
+        loads data saved by save, reading only the requested columns
+        columns of a store are memory mapped (see store.load_store to also select sessions and IDs)
+        :param path: path to file written by save
+        :param columns: list of columns to load (all if None)
+        :return: DataFrame indexed by ID, SES, AGE
+        """
+        index = list(cls.get_index())
+        usecols = None if columns is None else [*index, *columns]
+        if path.endswith('.store'):
+            return load_store(path, columns=columns)
+        elif path.endswith('.parquet'):
+            return pd.read_parquet(path, columns=columns)
+        elif path.endswith('.feather'):
+            return pd.read_feather(path, columns=usecols).set_index(index)
+        else:
+            return pd.read_csv(path, usecols=usecols).set_index(index)
+
+    @classmethod
+    def encode(cls, df):
+        """
+        converts validated columns to compact dtypes, e.g. strings to categoricals (kept by parquet, feather and store)
+        override for measures with string columns
+        :param df: DataFrame of data
+        :return: DataFrame with encoded columns
+        """
         return df
 
     @classmethod
     def subset_relevant_cols(cls, df):
-        df = df.loc[:, cls.get_cols()]
+        df = df.loc[:, cls.get_schema().cols]
         return df
 
     @classmethod
-    def score_if_needed(cls, df, keep):
+    def get_items(cls, df):
+        """
+        item columns of df, without copying when df has only them (as after subset_relevant_cols)
+        :param df: DataFrame of data
+        :return: DataFrame of items
+        """
+        cols = cls.get_schema().cols
+        return df if df.columns.equals(cols) else df[cols]
+
+    @classmethod
+    def score_if_needed(cls, df, keep, profiler=NoProfiler()):
         return df
 
     @classmethod
     def reorder(cls, df):
-        df = df.loc[:, cls.get_cols()]
+        cols = cls.get_schema().cols
+        if not df.columns.equals(cols):
+            df = df.loc[:, cols]
         return df
 
     @staticmethod
     def get_index():
         return pd.Index(['ID', 'SES', 'AGE'])
 
+    @classmethod
+    def get_restr(cls):
+        """
+        regex extracting item numbers from column names
+        """
+        return cls.get_prefix() + r"_(\d+)"
+
     @staticmethod
     def reverse_code(df, col_num, re_str, col_min, col_max):
         """
@@ -136,12 +690,61 @@ class Base(ABC):
         :param col_max: variable maximum
         :return: DataFrame of reverse coded data
         """
-        cols = df.columns[df.columns.str.extract(re_str)[0].astype(float).isin(col_num)]
-        df = df.reset_index()
-        df.loc[:, cols] = df.loc[:, cols].apply(lambda s: col_max + col_min - s)
-        df = df.set_index(['ID', 'SES', 'AGE'])
+        pos = np.flatnonzero(df.columns.str.extract(re_str)[0].astype(float).isin(col_num))
+        df = df.copy()
+        df.iloc[:, pos] = col_max + col_min - df.iloc[:, pos]
+        return df
+
+    @classmethod
+    def reverse_items(cls, df, col_num, col_min, col_max):
+        """
+        reverse codes items in place, same as reverse_code with the item numbers cached in the schema
+        :param df: DataFrame of data (modified)
+        :param col_num: list of item numbers to reverse code
+        :param col_min: variable minimum
+        :param col_max: variable maximum
+        :return: df
+        """
+        schema = cls.get_schema()
+        pos = np.flatnonzero(np.isin(schema.item_nums, col_num))
+        if not df.columns[:len(schema.cols)].equals(schema.cols):
+            pos = df.columns.get_indexer(schema.cols[pos])
+        # reversed on the float values, each column is cast back to its dtype (e.g. Int8 from compact)
+        values = col_max + col_min - df.iloc[:, pos].to_numpy(dtype=float, na_value=np.nan)
+        for j, p in enumerate(pos):
+            df.isetitem(p, pd.Series(values[:, j], index=df.index).astype(df.dtypes.iloc[p]))
         return df
 
+    @staticmethod
+    def downcast(df, cols):
+        """
+        casts columns holding only integers (or missing) to the smallest fitting nullable integer dtype
+        e.g. likert items to Int8 (1 byte per cell instead of 8 for float64)
+        :param df: DataFrame of data
+        :param cols: list of columns to cast (non-numeric or non-integer columns are left as is)
+        :return: DataFrame with cast columns
+        """
+        cols = [col for col in cols if pd.api.types.is_numeric_dtype(df[col])]
+        if len(cols) == 0:
+            return df
+        x = df[cols].to_numpy(dtype=float, na_value=np.nan)
+        missing = np.isnan(x)
+        integer = ((x == np.floor(x)) | missing).all(axis=0)
+        lo = np.where(missing, np.inf, x).min(axis=0)
+        hi = np.where(missing, -np.inf, x).max(axis=0)
+
+        dtypes = {}
+        for col, is_integer, col_lo, col_hi in zip(cols, integer, lo, hi):
+            if not is_integer:
+                continue
+            # signed only, so differences of items (e.g. ParentNeuro.score) do not wrap around
+            for dtype in ['Int8', 'Int16', 'Int32', 'Int64']:
+                info = np.iinfo(dtype.lower())
+                if col_lo >= info.min and col_hi <= info.max or col_lo > col_hi:
+                    dtypes[col] = dtype
+                    break
+        return df.astype(dtypes)
+
     @staticmethod
     def subset_cols_num(cols, num, re_str):
         """
@@ -158,12 +761,60 @@ class Base(ABC):
         """
         checks whether values in df are within range of discrete values or is missing
         returns true if invalid
+        contiguous integers on numeric data are checked as a range (see is_invalid_int_range) instead of hashing
         :param df: pd.DataFrame or pd.Series
         :param vals: list of acceptable values
         :return: pd.DataFrame or pd.Series of dtype Bool
         """
+        vals = list(vals)
+        numeric = df.dtypes.map(pd.api.types.is_numeric_dtype).all() if isinstance(df, pd.DataFrame) \
+            else pd.api.types.is_numeric_dtype(df)
+        integer = all(isinstance(x, (int, np.integer)) and not isinstance(x, bool) for x in vals)
+        if numeric and len(vals) > 0 and integer:
+            lo, hi = min(vals), max(vals)
+            if hi - lo + 1 == len(set(vals)):
+                return Base.is_invalid_int_range(df, lo, hi)
         return ~df.isin(vals) & ~df.isna()
 
+    @staticmethod
+    def is_invalid_int_range(df, lo, hi):
+        """
+        checks whether values in df are integers within lo and hi (inclusive) or missing, as an 'int' range rule
+        returns true if invalid
+        :param df: pd.DataFrame or pd.Series of numeric dtype
+        :param lo: minimum valid value
+        :param hi: maximum valid value
+        :return: pd.DataFrame or pd.Series of dtype Bool
+        """
+        frame = df.to_frame() if isinstance(df, pd.Series) else df
+        invalid = Base.evaluate_rules(frame, Base.compile_rules([(frame.columns, 'int', lo, hi)]))
+        if isinstance(df, pd.Series):
+            return invalid.iloc[:, 0].rename(df.name)
+        return invalid
+
+    @staticmethod
+    def report_to_mask(df, idx):
+        """
+        converts (index, column) report into a boolean mask aligned to df
+        :param df: DataFrame of data
+        :param idx: pd.DataFrame where each row indicates indices of invalid values
+        :return: pd.DataFrame of dtype Bool, True at every (index, column) in idx
+        """
+        mask = np.zeros(df.shape, dtype=bool)
+        if len(idx) and df.index.is_unique:
+            # positional lookup of every reported row at once
+            labels = idx['index'].tolist()
+            if isinstance(df.index, pd.MultiIndex):
+                labels = pd.MultiIndex.from_tuples(labels, names=df.index.names)
+            rows = df.index.get_indexer(labels)
+            cols = df.columns.get_indexer(idx['column'])
+            found = (rows >= 0) & (cols >= 0)
+            mask[rows[found], cols[found]] = True
+            return pd.DataFrame(mask, index=df.index, columns=df.columns)
+        for col, rows in idx.groupby('column', sort=False)['index']:
+            mask[:, df.columns.get_loc(col)] |= df.index.isin(rows.tolist())
+        return pd.DataFrame(mask, index=df.index, columns=df.columns)
+
     @staticmethod
     def argwhere(df):
         """
@@ -173,79 +824,103 @@ class Base(ABC):
         """
         if isinstance(df, pd.Series):
             df = df.to_frame()
-        idx = np.argwhere(df)
-        idx = pd.DataFrame(idx, columns=['index', 'column'])
-        idx['index'] = idx['index'].map(lambda x: df.index[x])
-        idx['column'] = idx['column'].map(lambda x: df.columns[x])
+        rows, cols = np.nonzero(df.to_numpy(dtype=bool))
+        idx = pd.DataFrame({
+            'index': df.index.take(rows).to_flat_index(),
+            'column': df.columns.take(cols)
+        })
         return idx
 
     @staticmethod
-    def calculate_age(df, how, dob_col, date_col, **kwargs):
+    def get_dob(df, dob_col):
+        """
+        :param df: dataframe
+        :param dob_col: column for dob
+        :return: pd.Series of dob indexed by unique ID
+        """
+        dob = pd.Series(df[dob_col].to_numpy(), index=df.index.get_level_values('ID'), name='_dob').dropna()
+        assert not dob.index.duplicated().any()
+        return dob
+
+    @staticmethod
+    def get_session_dates(df, date_col):
+        """
+        :param df: dataframe
+        :param date_col: dict mapping session to date column
+        :return: pd.Series of date indexed by unique (ID, SES)
+        """
+        ids = df.index.get_level_values('ID')
+        dates = []
+        for k in date_col:
+            # unique ID <-> date
+            date = pd.Series(df[date_col[k]].to_numpy(), index=ids).dropna()
+            assert not date.index.duplicated().any()
+            date.index = pd.MultiIndex.from_arrays([date.index, [k] * len(date)], names=['ID', 'SES'])
+            dates.append(date)
+        # unique ID,SES <-> date
+        dates = pd.concat(dates, axis=0).rename('_date')
+        assert not dates.index.duplicated().any()
+        return dates
+
+    @classmethod
+    def calculate_age(cls, df, how, dob_col, date_col, dob=None, dates=None, **kwargs):
         """
         calculates age based on dob and date of assessment
         :param df: dataframe
         :param how: whether to fill age or replace age
         :param dob_col: column for dob
         :param date_col: string for date column name or dict mapping session to date column
+        :param dob: precomputed get_dob (e.g. when df is only part of the data)
+        :param dates: precomputed get_session_dates (e.g. when df is only part of the data)
         :return: df with age
         """
+        if how not in ['replace', 'fill']:
+            raise ValueError("Invalid 'how' argument")
+
+        def to_datetime(ser):
+            return pd.to_datetime(ser, format=kwargs.get('format'), cache=True).to_numpy(dtype='datetime64[ns]')
+
+        def to_rows(ser):
+            # unique ID <-> value => value for each row using integer codes of ID (code -1 for missing ID)
+            return np.append(to_datetime(ser.reindex(uniques)), np.datetime64('NaT'))[codes]
+
+        codes, uniques = pd.factorize(df.index.get_level_values('ID'))
+
         # unique ID <-> DOB
-        dob = df.reset_index().set_index('ID')[dob_col].dropna().rename('_dob')
-        assert not dob.index.duplicated().any()
+        if dob is None:
+            dob = cls.get_dob(df, dob_col)
+        dob = to_rows(dob)
 
         # date on different row as data => get to same row
         if isinstance(date_col, dict):
-            dates = []
-            for k in date_col:
-                # unique ID <-> date
-                date = df.reset_index().set_index('ID')[date_col[k]].rename('_date').dropna().to_frame()
-                assert not date.index.duplicated().any()
-                date['SES'] = k
-                dates.append(date)
             # unique ID,SES <-> date
-            dates = pd.concat(dates, axis=0).reset_index().set_index(['ID', 'SES'])['_date']
-            assert not dates.index.duplicated().any()
-
-            df = df.reset_index().set_index(['ID', 'SES'])
-            assert '_date' not in df.columns
-            df = df.merge(dates, how='left', left_index=True, right_index=True)
-            df = df.reset_index().set_index('ID')
+            if dates is None:
+                dates = cls.get_session_dates(df, date_col)
+            ses = df.index.get_level_values('SES')
+            date = np.full(len(df), np.datetime64('NaT'), dtype='datetime64[ns]')
+            for k, ses_dates in dates.groupby(level='SES', sort=False):
+                rows = ses == k
+                date[rows] = to_rows(ses_dates.droplevel('SES'))[rows]
 
         # same row as data
         elif isinstance(date_col, str):
-            assert '_date' not in df.columns
-            df['_date'] = df[date_col]
-            df = df.reset_index().set_index('ID')
+            date = to_datetime(df[date_col])
 
         else:
             raise ValueError("Invalid 'date_col' argument")
 
-        # get dob for each date
-        assert '_dob' not in df.columns
-        assert '_age' not in df.columns
-        df = df.merge(dob, how='left', left_index=True, right_index=True)
-
         # calculate age
-        if 'format' in kwargs:
-            df['_age'] = np.floor(
-                (pd.to_datetime(df['_date'], format=kwargs['format']) - pd.to_datetime(df['_dob'], format=kwargs[
-                    'format'])) / pd.Timedelta(days=365.25))
-        else:
-            df['_age'] = np.floor(
-                (pd.to_datetime(df['_date']) - pd.to_datetime(df['_dob'])) / pd.Timedelta(
-                    days=365.25))
-
-        if how == 'replace':
-            df['AGE'] = df['_age']
-        elif how == 'fill':
-            df['AGE'] = df['AGE'].fillna(df['_age'])
-        else:
-            raise ValueError("Invalid 'how' argument")
-
-        df = df.drop(columns=['_date', '_dob', '_age'])
+        age = np.floor((date - dob) / np.timedelta64(int(365.25 * 24 * 60 * 60), 's'))
 
-        df = df.reset_index().set_index(['ID', 'SES', 'AGE'])
+        if how == 'fill':
+            old_age = df.index.get_level_values('AGE').to_numpy(dtype=float)
+            age = np.where(np.isnan(old_age), age, old_age)
 
+        df = df.copy(deep=False)
+        df.index = pd.MultiIndex.from_arrays(
+            [df.index.get_level_values('ID'), df.index.get_level_values('SES'), age],
+            names=['ID', 'SES', 'AGE']
+        )
         return df
 
 
@@ -268,6 +943,141 @@ class Measure(Base):
         """
         pass
 
+    @classmethod
+    def get_subscales(cls):
+        """
+        declares item membership of each sum score for sum_subscales
+        :return: dict mapping score suffix to list of item numbers or None if not sum scored
+        """
+        return None
+
+    @classmethod
+    def get_reverse_items(cls):
+        """
+        declares item numbers that sum_subscales reverse codes (between get_min and get_max) before summing
+        :return: list of item numbers
+        """
+        return []
+
+    @classmethod
+    def compile_subscales(cls):
+        """
+        compiles subscale membership into item by score weight matrix (see get_schema for the cached version)
+        reverse coded items have weight -1 and add min + max to the offset of their scores
+        :return: dict of item columns, score columns, weight matrix and offsets or None if not sum scored
+        """
+        subscales = cls.get_subscales()
+        if subscales is None:
+            return None
+        cols = pd.Index(cls.get_cols())
+        reverse = [f"{cls.get_prefix()}_{i}" for i in cls.get_reverse_items()]
+        sign = np.where(cols.isin(reverse), -1, 1)
+        weights = np.zeros((len(cols), len(subscales)))
+        for j, nums in enumerate(subscales.values()):
+            pos = cols.get_indexer([f"{cls.get_prefix()}_{i}" for i in nums])
+            assert (pos >= 0).all()
+            weights[pos, j] = sign[pos]
+        offsets = (weights < 0).sum(axis=0) * (cls.get_min() + cls.get_max()) if reverse else np.zeros(len(subscales))
+        return {
+            'cols': cols,
+            'score_cols': pd.Index([f"{cls.get_prefix()}_{x}" for x in subscales]),
+            'weights': weights,
+            'offsets': offsets
+        }
+
+    @classmethod
+    def sum_subscales(cls, df):
+        """
+        sums items into subscale scores with a single matrix product (reverse coding items in get_reverse_items)
+        a score is nan if any of its items are missing (same as sum with skipna=False)
+        :param df: DataFrame of data
+        :return: pd.DataFrame of scores
+        """
+        subscales = cls.get_schema().subscales
+        if not df.columns.equals(subscales['cols']):
+            df = df[subscales['cols']]
+        members = (subscales['weights'] != 0).astype(np.uint8)
+        scores = np.empty((len(df), subscales['weights'].shape[1]))
+        # score in row blocks so the float copy of the items stays small
+        for start in range(0, len(df), cls.BLOCK_ROWS):
+            x = df.iloc[start:start + cls.BLOCK_ROWS].to_numpy(dtype=float, copy=True)
+            missing = np.isnan(x)
+            x[missing] = 0
+            block = x @ subscales['weights'] + subscales['offsets']
+            block[(missing.view(np.uint8) @ members) > 0] = np.nan
+            scores[start:start + cls.BLOCK_ROWS] = block
+        return pd.DataFrame(scores, index=df.index, columns=subscales['score_cols'])
+
+    @classmethod
+    def get_max_groups(cls):
+        """
+        declares scores that sum the max of groups of items for sum_max_groups
+        a group is missing only if all of its items are missing, a score is missing if any of its groups is missing
+        :return: dict mapping score suffix to list of groups (lists of item numbers) or None if not scored this way
+        """
+        return None
+
+    @classmethod
+    def compile_max_groups(cls):
+        """
+        compiles groups into a column order where each group is contiguous (see get_schema for the cached version)
+        :return: dict of item columns, score columns, column order and group / score start positions or None
+        """
+        groups = cls.get_max_groups()
+        if groups is None:
+            return None
+        cols = pd.Index(cls.get_cols())
+        order, starts, score_starts = [], [], []
+        for score in groups.values():
+            score_starts.append(len(starts))
+            for group in score:
+                starts.append(len(order))
+                pos = cols.get_indexer([f"{cls.get_prefix()}_{i}" for i in group])
+                assert (pos >= 0).all()
+                order.extend(pos)
+        return {
+            'cols': cols,
+            'score_cols': pd.Index([f"{cls.get_prefix()}_{x}" for x in groups]),
+            'order': np.array(order),
+            'starts': np.array(starts),
+            'score_starts': np.array(score_starts)
+        }
+
+    @classmethod
+    def sum_max_groups(cls, df):
+        """
+        sums the max of each group of items with one grouped reduction per row block
+        fmax ignores missing items unless the whole group is missing, add then propagates missing groups
+        :param df: DataFrame of data
+        :return: pd.DataFrame of scores
+        """
+        groups = cls.get_schema().max_groups
+        if not df.columns.equals(groups['cols']):
+            df = df[groups['cols']]
+        scores = np.empty((len(df), len(groups['score_cols'])))
+        for start in range(0, len(df), cls.BLOCK_ROWS):
+            # items of each group next to each other
+            x = df.iloc[start:start + cls.BLOCK_ROWS].to_numpy(dtype=float)[:, groups['order']]
+            group_max = np.fmax.reduceat(x, groups['starts'], axis=1)
+            scores[start:start + cls.BLOCK_ROWS] = np.add.reduceat(group_max, groups['score_starts'], axis=1)
+        return pd.DataFrame(scores, index=df.index, columns=groups['score_cols'])
+
+    @classmethod
+    def compile_schema(cls):
+        schema = super().compile_schema()
+        schema['score_cols'] = pd.Index(cls.get_score_cols())
+        schema['subscales'] = cls.compile_subscales()
+        schema['max_groups'] = cls.compile_max_groups()
+        return schema
+
+    @classmethod
+    def get_data_dict(cls):
+        """
+        likert items as small nullable integers, scores as float
+        """
+        schema = cls.get_schema()
+        return {**dict.fromkeys(schema.cols, 'Int16'), **dict.fromkeys(schema.score_cols, 'float64')}
+
     @classmethod
     def get_score_cols(cls):
         if len(cls.get_score_suffixes()) == 0:
@@ -278,23 +1088,45 @@ class Measure(Base):
     @classmethod
     def subset_relevant_cols(cls, df):
         # subset to relevant columns depending on if score already included
-        df = df.loc[:, [*cls.get_cols(), *df.columns[df.columns.isin(cls.get_score_cols())]]]
+        schema = cls.get_schema()
+        df = df.loc[:, schema.cols.append(df.columns[df.columns.isin(schema.score_cols)])]
         return df
 
     @classmethod
-    def score_if_needed(cls, df, keep):
+    def score_if_needed(cls, df, keep, profiler=NoProfiler()):
         # score
         assert isinstance(df, pd.DataFrame)
-        score = cls.score(df)
-        df = pd.concat([df[[*cls.get_cols(), *df.columns[df.columns.isin(cls.get_score_cols())]]], score], axis=1)
-        assert isinstance(df, pd.DataFrame)
+        with profiler.stage(cls, 'score', lambda: score):
+            score = cls.score(df)
+        if isinstance(score, pd.Series):
+            score = score.to_frame()
+        schema = cls.get_schema()
+        cols = schema.cols.append(df.columns[df.columns.isin(schema.score_cols)])
+        # shallow copy so assigning score columns below does not touch the caller's frame
+        df = df.copy(deep=False) if df.columns.equals(cols) else df[cols]
         # handle potential duplicate columns due to scoring
-        df = cls.handle_duplicate(df, keep)
+        with profiler.stage(cls, 'handle_duplicate', lambda: df):
+            dup = score.columns.isin(df.columns)
+            if dup.any():
+                # only the duplicated columns are reconciled and written back in place
+                dup = score.columns[dup]
+                resolved = cls.handle_duplicate(pd.concat([df[dup], score[dup]], axis=1), keep)
+                for col in dup:
+                    df[col] = resolved[col]
+            # in output order (see reorder) so reorder does not need a copy
+            for col in score.columns[~score.columns.isin(df.columns)].sort_values():
+                df[col] = score[col]
         return df
 
     @classmethod
     def reorder(cls, df):
-        df = df[[*cls.get_cols(), *df.columns[df.columns.isin(cls.get_score_cols())]]]
+        """
+        items in order of get_cols followed by score columns in alphabetical order (the layout of saved outputs)
+        """
+        schema = cls.get_schema()
+        cols = schema.cols.append(df.columns[df.columns.isin(schema.score_cols)].sort_values())
+        if not df.columns.equals(cols):
+            df = df[cols]
         return df
 
     @staticmethod
@@ -306,32 +1138,31 @@ class Measure(Base):
         'first' keeps the original score, 'last' keeps newly calculated score
         :return: pd.DataFrame of scored data without duplicate columns
         """
+        dup = df.columns.duplicated(keep=False)
+        if not dup.any():
+            return df
 
-        def drop_if_same(df, keep, errors):
-            assert len(df) <= 2
-            # only one row
-            if len(df) == 1:
-                ser = df.iloc[0]
+        # only the duplicated (score) columns are compared, the rest are left untouched
+        drop = np.zeros(len(df.columns), dtype=bool)
+        errors = []
+        for col in df.columns[dup].unique():
+            pos = np.flatnonzero(df.columns == col)
+            assert len(pos) == 2
+            vals = df.iloc[:, pos].to_numpy(dtype=float, na_value=np.nan)
             # drop one if no discrepancy
-            elif (df.eq(df.iloc[0, :], axis='columns').all(axis=0) | df.isna().all(axis=0)
-                    | pd.Series(np.isclose(df.iloc[0], df.iloc[1]), index=df.columns)).all():
-                ser = df.iloc[0, :]
+            if (np.isnan(vals).all(axis=1) | np.isclose(vals[:, 0], vals[:, 1])).all():
+                drop[pos[1]] = True
             # decide how to drop if discrepancy
+            elif keep == 'first':
+                drop[pos[1]] = True
+            elif keep == 'last':
+                drop[pos[0]] = True
             else:
-                if keep:
-                    ser = df.iloc[~df.index.duplicated(keep=keep), :].squeeze()
-                else:
-                    errors.append(df)
-                    ser = None
-
-            return ser
+                errors.append(df.iloc[:, pos])
 
-        df = df.T
-        errors = []
-        df = df.groupby(df.index, dropna=False).apply(lambda x: drop_if_same(x, keep, errors))
         if errors:
             raise ExceptionWithData(
                 'Handling of duplicates undefined',
-                pd.concat(errors, axis=0).T
+                pd.concat(errors, axis=1)
             )
-        return df.T
+        return df.loc[:, ~drop]
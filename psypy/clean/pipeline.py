@@ -0,0 +1,140 @@
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .measure import Base
+from .profiling import NoProfiler, Profiler
+
+
+EXECUTORS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor
+}
+
+
+def clean_measure(measure, df, output_path, to_na=True, rev_code=False, output_format='csv', **kwargs):
+    """
+    cleans and saves one measure from prepared data (unit of work for process_many)
+    :param measure: measure class
+    :param df: DataFrame of data returned by Base.prepare
+    :param output_path: output path
+    :return: tuple of processed DataFrame and profiler used (a copy when run in a worker process)
+    """
+    profiler = kwargs.get('profiler', NoProfiler())
+    df, _ = measure.clean(df, to_na=to_na, rev_code=rev_code, **kwargs)
+    if output_path is not None:
+        with profiler.stage(measure, 'save', lambda: df):
+            measure.save(df, output_path, output_format=output_format)
+    return df, profiler
+
+
+def process_many(df, measures, output_path, calc_age=None, mapping=None, to_na=True, rev_code=False,
+                 output_format='csv', executor=None, max_workers=None, **kwargs):
+    """
+    processes several measures from the same (wide) DataFrame
+    the input is copied, validated, renamed and aged once instead of once per measure
+    :param df: DataFrame of data
+    :param measures: list of measure classes to process
+    :param output_path: output path
+    :param calc_age: whether to calculate age
+    :param mapping: dict mapping df column names to expected measure column names
+    :param to_na: bool whether to convert invalid values to np.nan
+    :param rev_code: bool whether to reverse code
+    :param output_format: one of measure.WRITERS
+    :param executor: None to process measures serially, 'thread' or 'process' to process them concurrently
+    (measure classes must be importable at module level for 'process')
+    :param max_workers: number of workers for executor
+    :param profiler: profiling.Profiler to collect per stage timing and memory
+    (memory of concurrent stages overlaps with executor='thread')
+    :return: dict mapping measure class name to processed DataFrame
+    """
+    df = Base.prepare(df, calc_age=calc_age, mapping=mapping, **kwargs)
+
+    if executor is None:
+        return {
+            measure.__name__: clean_measure(
+                measure, df, output_path, to_na=to_na, rev_code=rev_code, output_format=output_format, **kwargs
+            )[0]
+            for measure in measures
+        }
+
+    if executor not in EXECUTORS:
+        raise ValueError("Invalid 'executor' argument")
+    profiler = kwargs.pop('profiler', NoProfiler())
+    with EXECUTORS[executor](max_workers=max_workers) as pool:
+        # only ship the columns each measure needs to the workers
+        futures = {
+            measure.__name__: pool.submit(
+                clean_measure, measure, measure.subset_relevant_cols(df), output_path,
+                to_na=to_na, rev_code=rev_code, output_format=output_format,
+                # worker processes record into their own copy which is sent back
+                profiler=profiler.copy() if executor == 'process' else profiler, **kwargs
+            )
+            for measure in measures
+        }
+        results = {}
+        for name, future in futures.items():
+            results[name], worker_profiler = future.result()
+            if executor == 'process' and isinstance(profiler, Profiler):
+                profiler.records.extend(worker_profiler.records)
+        return results
+
+
+def read_measures(path, measures, mapping=None, extra_cols=None, engine='pyarrow'):
+    """
+    reads only the columns of the given measures from a csv export, with the dtypes declared by get_data_dict
+    columns not in the file are skipped (see registry.detect), so missing measures fail later in clean as before
+    :param path: path to .csv file with ID, SES, AGE columns
+    :param measures: list of measure classes to read columns for
+    :param mapping: dict mapping file column names to expected measure column names (as in process, not applied here)
+    :param extra_cols: list of other file columns to read, e.g. date of birth and session date columns for calc_age
+    :param engine: read_csv engine, 'pyarrow' falls back to 'c' if pyarrow is not installed
+    :return: DataFrame indexed by ID, SES, AGE with the original column names
+    """
+    inverse = {v: k for k, v in (mapping or {}).items()}
+    dtypes = {}
+    for measure in measures:
+        dtypes.update({inverse.get(col, col): dtype for col, dtype in measure.get_data_dict().items()})
+    header = pd.read_csv(path, nrows=0).columns
+    index = list(Base.get_index())
+    usecols = [*index, *header[header.isin(list(dtypes) + list(extra_cols or []))].difference(index, sort=False)]
+    dtypes = {col: dtype for col, dtype in dtypes.items() if col in header}
+
+    if engine == 'pyarrow':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            engine = 'c'
+    # integer items are parsed as Float32 so a value that does not fit (e.g. 2.5 in a likert item) does not fail the
+    # read, and are cast to their declared dtype afterwards unless they hold such values (left to clean to flag)
+    integer = {col: dtype for col, dtype in dtypes.items() if pd.api.types.is_integer_dtype(dtype)}
+    parsed = {**dtypes, **dict.fromkeys(integer, 'Float32')}
+    try:
+        df = pd.read_csv(path, usecols=usecols, dtype=parsed, engine=engine)
+        coerced = []
+    except (ValueError, TypeError):
+        # text in a numeric column, numeric columns are read as text and only the failing ones coerced (text to nan)
+        numeric = [col for col, dtype in parsed.items() if dtype != 'category']
+        df = pd.read_csv(path, usecols=usecols, dtype={**parsed, **dict.fromkeys(numeric, object)}, engine=engine)
+        coerced = []
+        for col in numeric:
+            try:
+                df[col] = df[col].astype(parsed[col])
+            except (ValueError, TypeError):
+                df[col] = pd.to_numeric(df[col], errors='coerce').astype(parsed[col])
+                coerced.append(col)
+        warnings.warn(f"Non numeric values read as missing in columns: {coerced}")
+
+    relaxed = []
+    for col, dtype in integer.items():
+        values = df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+        if (np.isnan(values) | (values == np.floor(values))).all():
+            df[col] = df[col].astype(dtype)
+        else:
+            relaxed.append(col)
+    if relaxed:
+        warnings.warn(f"Non integer values, columns read as Float32 instead of their declared dtype: {relaxed}")
+    # same column order as the file whatever the engine
+    return df[header[header.isin(usecols)]].set_index(index)
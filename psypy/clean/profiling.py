@@ -0,0 +1,107 @@
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+# stages currently tracing memory (across threads), tracing is stopped when the last one ends if a stage started it
+TRACING = {'lock': threading.Lock(), 'stages': 0, 'started': False}
+
+
+def start_tracing():
+    """
+    starts tracemalloc for a stage unless it is already tracing
+    """
+    with TRACING['lock']:
+        if TRACING['stages'] == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            TRACING['started'] = True
+        TRACING['stages'] += 1
+
+
+def stop_tracing():
+    """
+    stops tracemalloc after the last stage if it was started by start_tracing, so later unprofiled runs are not slowed down
+    """
+    with TRACING['lock']:
+        TRACING['stages'] -= 1
+        if TRACING['stages'] == 0 and TRACING['started']:
+            tracemalloc.stop()
+            TRACING['started'] = False
+
+
+class Profiler:
+    """
+    collects wall time, peak memory and size of the data after each stage of process
+    pass as profiler=Profiler() to process, process_chunked or process_many
+    """
+
+    def __init__(self, memory=True, callback=None):
+        """
+        :param memory: whether to trace peak memory with tracemalloc (slows down processing)
+        :param callback: function called with the record (dict) of each finished stage, e.g. for logging
+        """
+        self.memory = memory
+        self.callback = callback
+        self.records = []
+
+    def copy(self):
+        """
+        :return: Profiler with the same settings and no records
+        """
+        return Profiler(memory=self.memory, callback=self.callback)
+
+    @contextmanager
+    def stage(self, measure, name, get_df=None):
+        """
+        times the enclosed stage
+        :param measure: measure class
+        :param name: stage name
+        :param get_df: function returning the data after the stage (for row and cell counts)
+        """
+        if self.memory:
+            start_tracing()
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            # peak memory allocated during the stage on top of what was allocated before
+            memory = tracemalloc.get_traced_memory()[1] - start_memory if self.memory else None
+            if self.memory:
+                stop_tracing()
+        record = {
+            'measure': measure.__name__,
+            'stage': name,
+            'seconds': seconds,
+            'memory': memory,
+            'rows': None,
+            'cells': None
+        }
+        df = None if get_df is None else get_df()
+        if isinstance(df, (pd.DataFrame, pd.Series)):
+            record['rows'], record['cells'] = len(df), df.size
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def to_frame(self):
+        """
+        :return: pd.DataFrame with one row per stage
+        """
+        return pd.DataFrame(self.records, columns=['measure', 'stage', 'seconds', 'memory', 'rows', 'cells'])
+
+
+class NoProfiler:
+    """
+    default profiler that records nothing
+    """
+
+    def copy(self):
+        return self
+
+    def stage(self, measure, name, get_df=None):
+        return nullcontext()
@@ -0,0 +1,115 @@
+"""
+static table of the measure classes of each subpackage, so measures are imported only on first use
+
+regenerate the tables after adding or renaming a measure with: python -m psypy.clean.registry
+"""
+import ast
+import inspect
+import os
+from importlib import import_module
+
+import numpy as np
+import pandas as pd
+
+SUBPACKAGES = ['clinical', 'cognitive', 'summary']
+
+
+def scan(subpackage):
+    """
+    finds the measures defined in each module of a subpackage
+    modules are imported to leave out abstract classes (e.g. HDRS, ParentNeuro), which can not be processed
+    :param subpackage: name of subpackage of psypy.clean
+    :return: dict mapping class name to module name, in order of definition
+    """
+    directory = os.path.join(os.path.dirname(__file__), subpackage)
+    classes = {}
+    for file_name in sorted(os.listdir(directory)):
+        if file_name.endswith('.py') and not file_name.startswith('_'):
+            with open(os.path.join(directory, file_name)) as f:
+                tree = ast.parse(f.read())
+            module = import_module(f"psypy.clean.{subpackage}.{file_name[:-3]}")
+            for node in tree.body:
+                if isinstance(node, ast.ClassDef) and not inspect.isabstract(getattr(module, node.name)):
+                    classes[node.name] = file_name[:-3]
+    return classes
+
+
+def write(subpackage):
+    """
+    writes the table of a subpackage to its _measures.py
+    :param subpackage: name of subpackage of psypy.clean
+    """
+    lines = [f"    {name!r}: {module!r},\n" for name, module in scan(subpackage).items()]
+    with open(os.path.join(os.path.dirname(__file__), subpackage, '_measures.py'), 'w') as f:
+        f.write('# generated by python -m psypy.clean.registry, do not edit\n')
+        f.write('MEASURES = {\n')
+        f.writelines(lines)
+        f.write('}\n')
+
+
+def get_table():
+    """
+    :return: dict mapping class name to full module name of every measure class in psypy.clean
+    """
+    table = {}
+    for subpackage in SUBPACKAGES:
+        package = import_module(f"psypy.clean.{subpackage}")
+        table.update({name: f"{package.__name__}.{module}" for name, module in package.MEASURES.items()})
+    return table
+
+
+def get_measures():
+    """
+    imports every measure module
+    :return: list of every measure class in psypy.clean
+    """
+    return [getattr(import_module(module), name) for name, module in get_table().items()]
+
+
+def detect(columns, measures=None, mapping=None):
+    """
+    finds which measures an export has from its header, looking up each column once in a column to measure index
+    :param columns: column names (e.g. df.columns)
+    :param measures: list of measure classes to look for (every measure if None)
+    :param mapping: dict mapping column names to expected measure column names (as in process)
+    :return: pd.DataFrame indexed by measure name with columns measure (class), status ('complete', 'partial' or
+    'absent'), present (number of columns found) and missing (list of columns not found)
+    """
+    if measures is None:
+        measures = get_measures()
+    # column to (measure, position) pairs since a column can belong to several measures
+    index = {}
+    for i, measure in enumerate(measures):
+        for j, col in enumerate(measure.get_schema().cols):
+            index.setdefault(col, []).append((i, j))
+
+    found = [np.zeros(len(measure.get_schema().cols), dtype=bool) for measure in measures]
+    mapping = mapping or {}
+    for col in columns:
+        for i, j in index.get(mapping.get(col, col), []):
+            found[i][j] = True
+
+    rows = []
+    for measure, present in zip(measures, found):
+        n = int(present.sum())
+        status = 'complete' if n == len(present) else 'partial' if n > 0 else 'absent'
+        rows.append([measure, status, n, list(measure.get_schema().cols[~present])])
+    return pd.DataFrame(rows, index=[measure.__name__ for measure in measures],
+                        columns=['measure', 'status', 'present', 'missing'])
+
+
+def find_measures(columns, partial=False, measures=None, mapping=None):
+    """
+    measures that can be processed from an export (see detect)
+    :param columns: column names (e.g. df.columns)
+    :param partial: whether to include measures with only some columns (which process can not subset)
+    :return: list of measure classes
+    """
+    detected = detect(columns, measures=measures, mapping=mapping)
+    statuses = ['complete', 'partial'] if partial else ['complete']
+    return detected.loc[detected['status'].isin(statuses), 'measure'].tolist()
+
+
+if __name__ == '__main__':
+    for name in SUBPACKAGES:
+        write(name)
@@ -0,0 +1,138 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+def save_column(path, series):
+    """
+    saves one column as .npy file(s) that can be memory mapped
+    :param path: path without extension
+    :param series: pd.Series
+    :return: dict describing how to load the column
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        np.save(f"{path}.npy", series.cat.codes.to_numpy())
+        return {'kind': 'category', 'categories': dtype.categories.tolist(), 'ordered': bool(dtype.ordered)}
+    elif isinstance(dtype, pd.api.extensions.ExtensionDtype) and hasattr(dtype, 'numpy_dtype'):
+        # nullable Int/Float/boolean (e.g. from compact) as values and missing mask
+        np.save(f"{path}.npy", series.to_numpy(dtype=dtype.numpy_dtype, na_value=0))
+        np.save(f"{path}.mask.npy", series.isna().to_numpy())
+        return {'kind': 'masked', 'dtype': str(dtype)}
+    elif isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+        np.save(f"{path}.npy", series.to_numpy())
+        return {'kind': 'numpy'}
+    else:
+        # anything else is stored as codes into its unique values
+        codes, categories = pd.factorize(series)
+        np.save(f"{path}.npy", codes.astype(np.int32))
+        return {'kind': 'object', 'categories': categories.tolist()}
+
+
+def load_column(path, meta, rows):
+    """
+    loads one column saved by save_column, memory mapped unless it has to be converted
+    :param path: path without extension
+    :param meta: dict returned by save_column
+    :param rows: slice or np.ndarray of row positions
+    :return: np.ndarray or pd.api.extensions.ExtensionArray
+    """
+    values = np.load(f"{path}.npy", mmap_mode='r')[rows]
+    if meta['kind'] == 'category':
+        return pd.Categorical.from_codes(values, categories=meta['categories'], ordered=meta['ordered'])
+    elif meta['kind'] == 'masked':
+        mask = np.load(f"{path}.mask.npy", mmap_mode='r')[rows]
+        return pd.api.types.pandas_dtype(meta['dtype']).construct_array_type()(values, mask)
+    elif meta['kind'] == 'object':
+        categories = np.array(meta['categories'] + [np.nan], dtype=object)
+        return categories[values]
+    return values
+
+
+def write_store(df, path):
+    """
+    writes cleaned data as a columnar store, a directory per session with a .npy file per column
+    rows are sorted by ID so load_store can select a range of IDs without reading other rows
+    :param df: DataFrame indexed by ID, SES, AGE
+    :param path: directory of the store (replaced if it exists)
+    """
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    ses = df.index.get_level_values('SES')
+    sessions = ses.unique()
+    for k, session in enumerate(sessions):
+        part = df[ses == session]
+        id_codes, ids = pd.factorize(part.index.get_level_values('ID'), sort=True)
+        order = np.argsort(id_codes, kind='stable')
+        part = part.iloc[order]
+        directory = os.path.join(path, f"ses={k}")
+        os.makedirs(directory)
+        np.save(os.path.join(directory, 'ID.npy'), id_codes[order])
+        np.save(os.path.join(directory, 'AGE.npy'), part.index.get_level_values('AGE').to_numpy(dtype=float))
+        # files are named by position since column names need not be valid file names
+        columns = [save_column(os.path.join(directory, str(j)), part.iloc[:, j]) for j in range(part.shape[1])]
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump({'ID': ids.tolist(), 'columns': columns}, f)
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({'sessions': sessions.tolist(), 'columns': df.columns.tolist()}, f)
+
+
+def get_rows(id_codes, ids, select):
+    """
+    positions of rows of the selected IDs
+    :param id_codes: np.ndarray of sorted ID codes
+    :param ids: pd.Index of sorted IDs
+    :param select: slice of IDs (inclusive like .loc) or list of IDs
+    :return: slice (keeps columns memory mapped) or np.ndarray of row positions
+    """
+    if isinstance(select, slice):
+        lo = 0 if select.start is None else ids.searchsorted(select.start, side='left')
+        hi = len(ids) if select.stop is None else ids.searchsorted(select.stop, side='right')
+        return slice(*np.searchsorted(id_codes, [lo, hi], side='left'))
+    codes = ids.get_indexer(select)
+    return np.flatnonzero(np.isin(id_codes, codes[codes >= 0]))
+
+
+def load_store(path, columns=None, sessions=None, ids=None):
+    """
+    loads data written by write_store, only reading the requested columns, sessions and IDs
+    numeric columns stay memory mapped (read from disk when used) if a single session and range of IDs is selected
+    :param path: directory of the store
+    :param columns: list of columns to load (all if None)
+    :param sessions: list of sessions to load (all if None)
+    :param ids: slice of IDs (inclusive like .loc) or list of IDs to load (all if None)
+    :return: DataFrame indexed by ID, SES, AGE
+    """
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    all_columns = pd.Index(meta['columns'])
+    positions = np.arange(len(all_columns)) if columns is None else all_columns.get_indexer(columns)
+    if (positions < 0).any():
+        raise KeyError(f"Columns not in store: {list(all_columns[positions < 0])}")
+
+    frames = []
+    for k, session in enumerate(meta['sessions']):
+        if sessions is not None and session not in sessions:
+            continue
+        directory = os.path.join(path, f"ses={k}")
+        with open(os.path.join(directory, 'meta.json')) as f:
+            part = json.load(f)
+        id_codes = np.load(os.path.join(directory, 'ID.npy'), mmap_mode='r')
+        part_ids = pd.Index(part['ID'])
+        rows = slice(None) if ids is None else get_rows(id_codes, part_ids, ids)
+        data = {
+            all_columns[j]: load_column(os.path.join(directory, str(j)), part['columns'][j], rows) for j in positions
+        }
+        index = pd.MultiIndex.from_arrays([
+            part_ids.take(id_codes[rows]),
+            np.full(len(id_codes[rows]), session, dtype=object),
+            np.load(os.path.join(directory, 'AGE.npy'), mmap_mode='r')[rows]
+        ], names=['ID', 'SES', 'AGE'])
+        frames.append(pd.DataFrame(data, index=index, columns=all_columns[positions], copy=False))
+    if len(frames) == 0:
+        raise ValueError('No sessions selected')
+    return frames[0] if len(frames) == 1 else pd.concat(frames, axis=0)
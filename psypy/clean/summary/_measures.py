@@ -0,0 +1,4 @@
+# generated by python -m psypy.clean.registry, do not edit
+MEASURES = {
+    'Summary': 'summary',
+}
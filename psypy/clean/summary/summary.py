@@ -1,4 +1,5 @@
 from ..measure import Base
+import numpy as np
 import pandas as pd
 
 
@@ -34,27 +35,30 @@ class Summary(Base):
         ]]
 
     @classmethod
-    def check_range(cls, df):
-        idx = [
-            cls.argwhere(cls.is_invalid_discrete(df[f"{cls.get_prefix()}_sex"], ['M', 'F', 'O'])),
-            cls.argwhere(cls.is_invalid_discrete(
-                df[[f"{cls.get_prefix()}_{x}" for x in [
-                    'treatment_naive',
-                    'current_medication',
-                    'past_medication',
-                    'mdd_current',
-                    'bipolar_current',
-                    'gad_current',
-                    'panic_current',
-                    'social_phobia_current',
-                    'ptsd_current',
-                    'ocd_current',
-                    'anorexia_current',
-                    'other_eatdisorder_current'
-                ]]],
-                [1, 0]
-            )),
-            cls.argwhere(~df[f"{cls.get_prefix()}_race"].isin([
+    def get_flag_cols(cls):
+        return [f"{cls.get_prefix()}_{x}" for x in [
+            'treatment_naive',
+            'current_medication',
+            'past_medication',
+            'mdd_current',
+            'bipolar_current',
+            'gad_current',
+            'panic_current',
+            'social_phobia_current',
+            'ptsd_current',
+            'ocd_current',
+            'anorexia_current',
+            'other_eatdisorder_current'
+        ]]
+
+    @classmethod
+    def get_vocabularies(cls):
+        """
+        allowed values of string columns with a fixed vocabulary, used as their categories
+        """
+        return {
+            f"{cls.get_prefix()}_sex": ['M', 'F', 'O'],
+            f"{cls.get_prefix()}_race": [
                 'American Indian/Alaska Native',
                 'Asian',
                 'Native Hawaiian or Other Pacific Islander',
@@ -63,6 +67,60 @@ class Summary(Base):
                 'More Than One Race',
                 'Other',
                 'Unknown / Not Reported'
-            ]))
-        ]
-        return pd.concat(idx, axis=0)
+            ]
+        }
+
+    @classmethod
+    def get_category_cols(cls):
+        """
+        string columns without a fixed vocabulary
+        """
+        return [f"{cls.get_prefix()}_{x}" for x in [
+            'phenotype',
+            'treatment',
+            'dataset',
+            'current_medication_desc',
+            'past_medication_desc'
+        ]]
+
+    @classmethod
+    def get_data_dict(cls):
+        """
+        0 / 1 flags as small nullable integers and strings as categories
+        """
+        flags = cls.get_flag_cols()
+        return {col: 'Int8' if col in flags else 'category' for col in cls.get_schema().cols}
+
+    @classmethod
+    def get_invalid_mask(cls, df):
+        mask = np.zeros(df.shape, dtype=bool)
+        for col, vocabulary in cls.get_vocabularies().items():
+            # values outside of the vocabulary (and missing values) get code -1
+            invalid = pd.Categorical(df[col], categories=vocabulary).codes == -1
+            # race has to be reported, other columns may be missing
+            if col != f"{cls.get_prefix()}_race":
+                invalid &= df[col].notna().to_numpy()
+            mask[:, df.columns.get_loc(col)] = invalid
+        flags = cls.get_flag_cols()
+        mask[:, df.columns.get_indexer(flags)] = cls.is_invalid_discrete(df[flags], [1, 0]).to_numpy(dtype=bool)
+        return pd.DataFrame(mask, index=df.index, columns=df.columns)
+
+    @classmethod
+    def check_range(cls, df):
+        return cls.argwhere(cls.get_invalid_mask(df))
+
+    @classmethod
+    def encode(cls, df):
+        """
+        strings as categoricals, with the vocabulary as categories where there is one
+        values outside of the vocabulary that were kept (to_na False or 'ignore') are added after it
+        (free text columns that were read as numbers are left as is)
+        """
+        for col, vocabulary in cls.get_vocabularies().items():
+            values = df[col].dropna()
+            extra = pd.unique(values[~values.isin(vocabulary)].to_numpy(dtype=object))
+            df[col] = pd.Categorical(df[col], categories=[*vocabulary, *extra])
+        for col in cls.get_category_cols():
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = df[col].astype('category')
+        return df
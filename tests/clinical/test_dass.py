@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+import pandas as pd
+from psypy.clean.clinical.dass import DASS42
+
+
+class TestScore(unittest.TestCase):
+
+    def setUp(self):
+        self.TestMeasure = DASS42()
+
+    def test__standard__score(self):
+        np.random.seed(0)
+        df = pd.DataFrame(
+            np.random.randint(low=0, high=4, size=(5, 42)),
+            columns=self.TestMeasure.get_cols()
+        )
+        source = self.TestMeasure.score(df)
+        for suffix, items in self.TestMeasure.get_subscales().items():
+            target = df[[f"{self.TestMeasure.get_prefix()}_{i}" for i in items]].sum(axis=1)
+            self.assertTrue((source[f"{self.TestMeasure.get_prefix()}_{suffix}"] == target).all())
+
+    def test__nan__score(self):
+        df = pd.DataFrame(
+            np.ones((2, 42)),
+            columns=self.TestMeasure.get_cols()
+        )
+        # item 3 belongs to the depression subscale only
+        df.loc[0, f"{self.TestMeasure.get_prefix()}_3"] = np.nan
+        source = self.TestMeasure.score(df)
+        target = pd.DataFrame(
+            [[np.nan, 14, 14],
+             [14, 14, 14]],
+            columns=[f"{self.TestMeasure.get_prefix()}_{x}" for x in self.TestMeasure.get_score_suffixes()]
+        )
+        self.assertTrue(source.equals(target.astype(float)))
+
+    def test__order__process(self):
+        df = pd.DataFrame(
+            np.ones((2, 42)),
+            columns=self.TestMeasure.get_cols()
+        )
+        df['ID'] = [0, 1]
+        df['SES'] = 1
+        df['AGE'] = 30.5
+        source = self.TestMeasure.process(df.set_index(['ID', 'SES', 'AGE']), None)
+        # items in declared order, scores in alphabetical order
+        target = [*self.TestMeasure.get_cols(), 'dass42_score_anx', 'dass42_score_dep', 'dass42_score_str']
+        self.assertEqual(list(source.columns), target)
+
+
+if __name__ == "__main__":
+    unittest.main()
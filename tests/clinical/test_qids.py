@@ -26,6 +26,21 @@ class TestScore(unittest.TestCase):
         source = self.TestMeasure.score(df)
         self.assertTrue((target == source).all().all())
 
+    def test__missing__score(self):
+        df = pd.DataFrame(
+            np.ones((4, 16)),
+            columns=[f"{self.TestMeasure.get_prefix()}_{i + 1}" for i in range(16)]
+        )
+        # partially missing group
+        df.iloc[0, [0, 1, 2]] = np.nan
+        # fully missing group
+        df.iloc[1, [0, 1, 2, 3]] = np.nan
+        # missing single item
+        df.iloc[2, 4] = np.nan
+        source = self.TestMeasure.score(df)
+        self.assertEqual(source.name, 'qids_score')
+        self.assertTrue(np.allclose(source, [9, np.nan, np.nan, 9], equal_nan=True))
+
 
 if __name__ == "__main__":
     unittest.main()
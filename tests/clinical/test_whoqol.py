@@ -0,0 +1,51 @@
+import unittest
+import warnings
+import numpy as np
+import pandas as pd
+from psypy.clean.clinical.whoqol import WHOQOL
+
+
+class TestScore(unittest.TestCase):
+
+    def setUp(self):
+        self.TestMeasure = WHOQOL()
+
+    def test__reverse__score(self):
+        np.random.seed(0)
+        df = pd.DataFrame(
+            np.random.randint(low=1, high=6, size=(5, 26)).astype(float),
+            columns=self.TestMeasure.get_cols()
+        )
+        df.iloc[0, 2] = np.nan
+        source = self.TestMeasure.score(df)
+        # reverse code then sum
+        reversed_df = self.TestMeasure.reverse_code(
+            df, self.TestMeasure.get_reverse_items(), self.TestMeasure.get_restr(), 1, 5)
+        for suffix, items in self.TestMeasure.get_subscales().items():
+            target = reversed_df[[f"{self.TestMeasure.get_prefix()}_{i}" for i in items]].sum(axis=1, skipna=False)
+            self.assertTrue(np.allclose(source[f"{self.TestMeasure.get_prefix()}_{suffix}"], target, equal_nan=True))
+
+
+    def test__compact__reverse__process(self):
+        np.random.seed(0)
+        df = pd.DataFrame(
+            np.random.randint(low=1, high=6, size=(5, 26)).astype(float),
+            columns=self.TestMeasure.get_cols()
+        )
+        df.iloc[0, 2] = np.nan
+        df['ID'] = np.arange(5)
+        df['SES'] = 1
+        df['AGE'] = 30.5
+        df = df.set_index(['ID', 'SES', 'AGE'])
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            source = self.TestMeasure.process(df, None, rev_code=True, col_num=[2, 3], compact=True)
+        target = self.TestMeasure.process(df, None, rev_code=True, col_num=[2, 3])
+        self.assertEqual(source['whoqol_3'].dtype, 'Int8')
+        self.assertTrue(source['whoqol_3'].isna().iloc[0])
+        self.assertTrue(np.allclose(source.to_numpy(dtype=float, na_value=np.nan), target.to_numpy(dtype=float),
+                                    equal_nan=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+import pandas as pd
+from psypy.clean.cognitive.integneuro import IntegNeuroCompatible
+
+
+class TestCheckRange(unittest.TestCase):
+
+    def setUp(self):
+        self.TestMeasure = IntegNeuroCompatible()
+
+    def test__standard__check_range(self):
+        prefix = self.TestMeasure.get_prefix()
+        df = pd.DataFrame(
+            np.full((3, len(self.TestMeasure.get_cols())), 5.0),
+            columns=self.TestMeasure.get_cols()
+        )
+        # rt must be > 0
+        df.loc[0, f"{prefix}_getrtA"] = 0
+        # percent must be within [0, 100]
+        df.loc[1, f"{prefix}_getcpH"] = 101
+        # digit span must be an integer within [3, 9]
+        df.loc[2, f"{prefix}_digitsp"] = 3.5
+        # maze completion time must be >= initiation time
+        df.loc[2, f"{prefix}_emziniin"] = 6
+        # missing values are valid
+        df.loc[0, f"{prefix}_emzcmpin"] = np.nan
+        df.loc[0, f"{prefix}_emziniin"] = 10
+
+        target = set([
+            (0, f"{prefix}_getrtA"),
+            (1, f"{prefix}_getcpH"),
+            (2, f"{prefix}_digitsp"),
+            (2, f"{prefix}_emzcmpin")
+        ])
+        source = set([tuple([x['index'], x['column']]) for _, x in self.TestMeasure.check_range(df).iterrows()])
+        self.assertEqual(target, source)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+import numpy as np
+import pandas as pd
 from psypy.clean.cognitive.webneuro import WebNeuroCompatible
 
 
@@ -12,5 +14,17 @@ class TestProcess(unittest.TestCase):
         pass
 
 
+class TestDeprecated(unittest.TestCase):
+
+    def test__rules__is_invalid(self):
+        ser = pd.Series([3, 2, 9.5, np.nan])
+        with self.assertWarns(DeprecationWarning):
+            source = WebNeuroCompatible.is_invalid_digitsp(ser)
+        self.assertEqual(source.tolist(), [False, True, True, False])
+        with self.assertWarns(DeprecationWarning):
+            source = WebNeuroCompatible.is_invalid_perc(pd.Series([0, 100, 101, np.nan]))
+        self.assertEqual(source.tolist(), [False, False, True, False])
+
+
 if __name__ == "__main__":
     unittest.main()
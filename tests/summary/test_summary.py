@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from psypy.clean.summary.summary import Summary
+
+
+class TestSummary(unittest.TestCase):
+
+    def setUp(self):
+        n = 5
+        df = pd.DataFrame({col: [1, 0, 1, 0, 1] for col in Summary.get_flag_cols()})
+        df['summary_sex'] = ['M', 'F', 'X', np.nan, 'O']
+        df['summary_race'] = ['Asian', 'White', 'Other', 'White', np.nan]
+        for col in Summary.get_category_cols():
+            df[col] = ['a', 'b', 'a', np.nan, 'b']
+        df.loc[1, 'summary_mdd_current'] = 2
+        df['ID'] = np.arange(n)
+        df['SES'] = 1
+        df['AGE'] = 30.5
+        self.df = df.set_index(['ID', 'SES', 'AGE'])[Summary.get_cols()]
+
+    def test__standard__check_range(self):
+        source = Summary.check_range(self.df)
+        source = sorted(zip(source['index'].map(lambda x: x[0]), source['column']))
+        # invalid sex, invalid flag and missing race (missing sex is valid)
+        target = sorted([(2, 'summary_sex'), (1, 'summary_mdd_current'), (4, 'summary_race')])
+        self.assertEqual(source, target)
+
+    def test__categorical__process(self):
+        source = Summary.process(self.df, None)
+        self.assertEqual(list(source['summary_sex'].cat.categories), Summary.get_vocabularies()['summary_sex'])
+        self.assertEqual(source['summary_sex'].isna().tolist(), [False, False, True, True, False])
+        self.assertEqual(source['summary_race'].cat.codes.tolist(), [1, 4, 6, 4, -1])
+        self.assertIsInstance(source['summary_dataset'].dtype, pd.CategoricalDtype)
+        # categories are kept by the writer
+        with tempfile.TemporaryDirectory() as tmp:
+            Summary.save(source, tmp, output_format='parquet')
+            saved = Summary.load(os.path.join(tmp, 'summary.parquet'))
+        self.assertTrue(saved.equals(source))
+
+    def test__ignore__process(self):
+        df = self.df.copy()
+        df.loc[df.index[1], 'summary_race'] = 'Martian'
+        source = Summary.process(df, None, to_na='ignore')
+        # invalid values are kept after the vocabulary
+        self.assertEqual(source['summary_sex'].tolist()[:3], ['M', 'F', 'X'])
+        self.assertEqual(source['summary_race'].tolist()[:2], ['Asian', 'Martian'])
+        self.assertEqual(list(source['summary_sex'].cat.categories), Summary.get_vocabularies()['summary_sex'] + ['X'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from psypy.clean.aggregate import to_wide, to_wide_files
+
+
+class TestToWide(unittest.TestCase):
+
+    def setUp(self):
+        index = pd.MultiIndex.from_tuples(
+            [('sub0', 'baseline', 20.0), ('sub1', 'baseline', 30.0), ('sub0', 'followup', 21.0)],
+            names=['ID', 'SES', 'AGE'])
+        self.a = pd.DataFrame({'a_1': [1.0, 2.0, 3.0], 'a_sex': ['F', 'M', 'F']}, index=index)
+        index = pd.MultiIndex.from_tuples(
+            [('sub2', 'followup', 40.0), ('sub0', 'followup', 21.0)],
+            names=['ID', 'SES', 'AGE'])
+        self.b = pd.DataFrame({'b_1': [4, 5]}, index=index)
+
+    def test__standard__to_wide(self):
+        source = to_wide({'A': self.a, 'B': self.b})
+        # reference built with repeated merges of unstacked measures
+        target = None
+        for df in [self.a, self.b]:
+            df = df.reset_index('AGE', drop=True).unstack('SES')
+            df.columns = [f"{col}_ses{ses}" for col, ses in df.columns]
+            target = df if target is None else target.merge(df, how='outer', left_index=True, right_index=True)
+        target = target.reindex(source.index)
+        self.assertEqual(list(source.index), ['sub0', 'sub1', 'sub2'])
+        self.assertEqual(list(source.columns[:2]), ['AGE_sesbaseline', 'AGE_sesfollowup'])
+        self.assertTrue(np.allclose(source['AGE_sesfollowup'], [21, np.nan, 40], equal_nan=True))
+        # every measure gets a column for every session
+        self.assertTrue(source['b_1_sesbaseline'].isna().all())
+        for col in ['a_1_sesbaseline', 'a_1_sesfollowup', 'b_1_sesfollowup']:
+            self.assertTrue(np.allclose(source[col], target[col].astype(float), equal_nan=True))
+        self.assertEqual(list(source['a_sex_sesbaseline'].fillna('')), list(target['a_sex_sesbaseline'].fillna('')))
+
+    def test__dtypes__to_wide(self):
+        a = self.a.astype({'a_1': 'Int8', 'a_sex': 'category'})
+        source = to_wide([a])
+        # compact items and categoricals keep their dtype, missing sessions are filled with their missing value
+        self.assertEqual(source['a_1_sesfollowup'].dtype, 'Int8')
+        self.assertEqual(source['a_1_sesfollowup'].isna().tolist(), [False, True])
+        self.assertEqual(source['a_sex_sesbaseline'].dtype, a['a_sex'].dtype)
+        self.assertEqual(source['a_sex_sesbaseline'].tolist(), ['F', 'M'])
+
+    def test__sessions__to_wide(self):
+        source = to_wide([self.a], sessions=['followup'])
+        self.assertEqual(list(source.columns), ['AGE_sesfollowup', 'a_1_sesfollowup', 'a_sex_sesfollowup'])
+
+    def test__duplicate__to_wide(self):
+        with self.assertRaises(ValueError):
+            to_wide([pd.concat([self.a, self.a])])
+
+    def test__files__to_wide(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, 'a.parquet'), os.path.join(tmp, 'b.csv')]
+            self.a.to_parquet(paths[0])
+            self.b.to_csv(paths[1])
+            source = to_wide_files(paths)
+        target = to_wide([self.a, self.b])
+        self.assertTrue(source.equals(target))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,13 @@
+import os
+import tempfile
+import tracemalloc
 import unittest
 
 import numpy as np
 import pandas as pd
-from psypy.clean.measure import Measure
+from psypy.clean.clinical.dass import DASS42
+from psypy.clean.measure import Measure, ExceptionWithData
+from psypy.clean.profiling import Profiler
 
 
 class TestInstantiation(unittest.TestCase):
@@ -30,6 +35,42 @@ class TestInstantiation(unittest.TestCase):
     # TODO: implement rest of instantiation
 
 
+class TestSchema(unittest.TestCase):
+
+    def setUp(self):
+        class TestMeasure(Measure):
+            @classmethod
+            def get_prefix(cls):
+                return 'test'
+
+            @classmethod
+            def get_cols(cls):
+                return [f'test_{i}' for i in range(5)]
+
+            @classmethod
+            def get_score_suffixes(cls):
+                return ['score']
+
+        class TestMeasureShort(TestMeasure):
+            @classmethod
+            def get_cols(cls):
+                return [f'test_{i}' for i in range(3)]
+
+        self.TestMeasure = TestMeasure
+        self.TestMeasureShort = TestMeasureShort
+
+    def test__standard__get_schema(self):
+        schema = self.TestMeasure.get_schema()
+        self.assertIs(schema, self.TestMeasure.get_schema())
+        self.assertTrue(schema.cols.equals(pd.Index(self.TestMeasure.get_cols())))
+        self.assertTrue(schema.score_cols.equals(pd.Index(['test_score'])))
+
+    def test__subclass__get_schema(self):
+        self.TestMeasure.get_schema()
+        self.assertEqual(len(self.TestMeasureShort.get_schema().cols), 3)
+        self.assertEqual(len(self.TestMeasure.get_schema().cols), 5)
+
+
 class TestCheckRange(unittest.TestCase):
 
     def setUp(self):
@@ -74,6 +115,111 @@ class TestCheckRange(unittest.TestCase):
         self.assertEqual(len(idx), 5)
 
 
+class TestInvalidMask(unittest.TestCase):
+
+    def setUp(self):
+        class TestMeasure(Measure):
+            @classmethod
+            def get_prefix(cls):
+                return 'test'
+
+            @classmethod
+            def get_cols(cls):
+                return [f'test_{i}' for i in range(5)]
+
+            @classmethod
+            def get_score_suffixes(cls):
+                return []
+
+            @classmethod
+            def check_range(cls, df):
+                vals = [i for i in range(0, 3 + 1)]
+                return cls.argwhere(cls.is_invalid_discrete(df[cls.get_cols()], vals))
+
+            @classmethod
+            def score(cls, df):
+                return df
+
+        self.TestMeasure = TestMeasure
+        df = pd.DataFrame(
+            [[0, 1, 2, 3, 4],
+             [4, 3, 2, 1, 0],
+             [1, 9, 0, 2, 3]],
+            columns=TestMeasure.get_cols()
+        )
+        df['ID'] = ['a', 'b', 'c']
+        df['SES'] = 1
+        df['AGE'] = 20
+        self.df = df.set_index(['ID', 'SES', 'AGE'])
+
+    def test__standard__get_invalid_mask(self):
+        source = self.TestMeasure.get_invalid_mask(self.df)
+        target = self.df > 3
+        self.assertTrue(source.equals(target))
+
+    def test__to_na__process(self):
+        source = self.TestMeasure.process(self.df, None)
+        target = self.df.mask(self.df > 3)
+        self.assertTrue(source.astype(float).equals(target.astype(float)))
+
+    def test__raise__process(self):
+        with self.assertRaises(ExceptionWithData) as cm:
+            self.TestMeasure.process(self.df, None, to_na=False)
+        source = set([tuple([x['index'], x['column']]) for _, x in cm.exception.data.iterrows()])
+        target = set([
+            (('a', 1, 20), 'test_4'),
+            (('b', 1, 20), 'test_0'),
+            (('c', 1, 20), 'test_1')
+        ])
+        self.assertEqual(source, target)
+
+
+class TestIsInvalidDiscrete(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        df = pd.DataFrame(np.random.choice([0, 1, 2, 3, 4, -1, 2.5, np.nan, np.inf], size=(100, 3)))
+        df[3] = pd.array(np.random.choice([0, 1, 5, None], 100), dtype='Int16')
+        df[4] = np.random.randint(-2, 6, 100)
+        self.df = df
+
+    def test__range__is_invalid_discrete(self):
+        for vals in [range(0, 4), [1, 0], list(range(1, 101))]:
+            source = Measure.is_invalid_discrete(self.df, vals)
+            target = (~self.df.isin(vals) & ~self.df.isna()).astype(bool)
+            self.assertTrue(source.equals(target))
+            self.assertTrue(Measure.is_invalid_discrete(self.df[0], vals).equals(target[0]))
+
+    def test__not_contiguous__is_invalid_discrete(self):
+        # hashed membership as before (nullable columns give nullable booleans)
+        source = Measure.is_invalid_discrete(self.df, [0, 2]).astype(bool)
+        target = (~self.df.isin([0, 2]) & ~self.df.isna()).astype(bool)
+        self.assertTrue(source.equals(target))
+        s = pd.Series(['M', 'F', 'X', np.nan])
+        self.assertEqual(Measure.is_invalid_discrete(s, ['M', 'F', 'O']).tolist(), [False, False, True, False])
+
+
+class TestArgwhere(unittest.TestCase):
+
+    def test__multiindex__argwhere(self):
+        df = pd.DataFrame(
+            [[True, False], [False, False], [True, True]],
+            columns=['a', 'b'],
+            index=pd.MultiIndex.from_tuples([(1, 1, 20), (2, 1, 21), (3, 2, 22)], names=['ID', 'SES', 'AGE'])
+        )
+        source = Measure.argwhere(df)
+        target = pd.DataFrame({
+            'index': [(1, 1, 20), (3, 2, 22), (3, 2, 22)],
+            'column': ['a', 'a', 'b']
+        })
+        self.assertTrue(source.equals(target))
+
+    def test__series__argwhere(self):
+        ser = pd.Series([False, True], index=['x', 'y'], name='a')
+        source = Measure.argwhere(ser)
+        self.assertEqual(list(source.itertuples(index=False, name=None)), [('y', 'a')])
+
+
 class TestReverseCode(unittest.TestCase):
     # TODO: implement rest of test cases
 
@@ -105,6 +251,29 @@ class TestReverseCode(unittest.TestCase):
         # TODO
         pass
 
+    def test__standard__reverse_items(self):
+        class TestMeasure(Measure):
+            @classmethod
+            def get_prefix(cls):
+                return 'test'
+
+            @classmethod
+            def get_cols(cls):
+                return [f'test_{i}' for i in range(5)]
+
+            @classmethod
+            def get_score_suffixes(cls):
+                return []
+
+        df = pd.DataFrame(
+            [[0, 1, 2, 3, 4],
+             [4, np.nan, 2, 1, 0]],
+            columns=TestMeasure.get_cols()
+        )
+        target = Measure.reverse_code(df, [1, 3], r'test_(\d+)', 0, 4)
+        source = TestMeasure.reverse_items(df.copy(), [1, 3], 0, 4)
+        self.assertTrue(source.equals(target))
+
 
 class TestHandleDuplicate(unittest.TestCase):
     def test__standard__first__handle_duplicate(self):
@@ -158,6 +327,33 @@ class TestHandleDuplicate(unittest.TestCase):
         source = Measure.handle_duplicate(df, keep='first')
         self.assertTrue(source.astype(float).equals(target.astype(float)))
 
+    def test__close__handle_duplicate(self):
+        df = pd.DataFrame(
+            [[1, 0.1 + 0.2, 'x', 0.3],
+             [4, np.nan, 'y', np.nan]],
+            columns=['c', 'a', 'b', 'a']
+        )
+        target = df.iloc[:, :3]
+        source = Measure.handle_duplicate(df, keep=None)
+        self.assertTrue(source.equals(target))
+
+
+class TestDowncast(unittest.TestCase):
+
+    def test__standard__downcast(self):
+        df = pd.DataFrame({
+            'a': [0.0, 3.0, np.nan],
+            'b': [1.0, 300.0, 2.0],
+            'c': [0.5, 1.0, 2.0],
+            'd': ['x', 'y', 'z'],
+            'e': [np.nan, np.nan, np.nan]
+        })
+        source = Measure.downcast(df, ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(list(source.dtypes.astype(str)), ['Int8', 'Int16', 'float64', 'object', 'Int8'])
+        self.assertTrue(source['a'].isna().equals(df['a'].isna()))
+        self.assertTrue(np.allclose(source[['a', 'b', 'c']].to_numpy(dtype=float, na_value=np.nan),
+                                    df[['a', 'b', 'c']].to_numpy(), equal_nan=True))
+
 
 class TestCalculateAge(unittest.TestCase):
     def setUp(self) -> None:
@@ -273,6 +469,219 @@ class TestCalculateAge(unittest.TestCase):
         self.assertTrue(source.sort_index().equals(target.sort_index()))
 
 
+class TestProcessChunked(unittest.TestCase):
+
+    def setUp(self) -> None:
+        class TestMeasure(Measure):
+            @classmethod
+            def get_prefix(cls):
+                return 'test'
+
+            @classmethod
+            def get_cols(cls):
+                return [f'test_{i}' for i in range(3)]
+
+            @classmethod
+            def get_score_suffixes(cls):
+                return ['score']
+
+            @classmethod
+            def check_range(cls, df):
+                vals = [i for i in range(0, 3 + 1)]
+                return cls.argwhere(cls.is_invalid_discrete(df[cls.get_cols()], vals))
+
+            @classmethod
+            def score(cls, df):
+                score = df[cls.get_cols()].sum(axis=1, skipna=False)
+                score.name = f"{cls.get_prefix()}_{cls.get_score_suffixes()[-1]}"
+                return score
+
+        self.TestMeasure = TestMeasure
+        np.random.seed(0)
+        n = 20
+        df = pd.DataFrame(np.random.randint(low=0, high=5, size=(2 * n, 3)), columns=['a', 'b', 'c'])
+        df['ID'] = [f'sub{i}' for i in range(n)] * 2
+        df['SES'] = ['screening'] * n + ['baseline'] * n
+        df['AGE'] = np.nan
+        # dob on screening rows, data on baseline rows
+        df['dob'] = [f'19{50 + i}-1-1' for i in range(n)] + [np.nan] * n
+        df['date'] = [np.nan] * n + ['2020-6-1'] * n
+        df.loc[:n - 1, ['a', 'b', 'c']] = np.nan
+        self.df = df.set_index(['ID', 'SES', 'AGE'])
+        self.kwargs = dict(
+            calc_age='replace', mapping={'a': 'test_0', 'b': 'test_1', 'c': 'test_2'},
+            dob_col='dob', date_col={'baseline': 'date'}
+        )
+
+    def test__csv__process_chunked(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'input.csv')
+            self.df.to_csv(path)
+            idx = self.TestMeasure.process_chunked(path, tmp, chunksize=7, **self.kwargs)
+            source = pd.read_csv(os.path.join(tmp, 'test.csv'), index_col=[0, 1, 2])
+        target = self.TestMeasure.process(self.df, None, **self.kwargs)
+        self.assertEqual(len(idx), (self.df[['a', 'b', 'c']] > 3).sum().sum())
+        self.assertTrue(np.allclose(source.values, target.values, equal_nan=True))
+        self.assertTrue((source.index == target.index).all())
+
+    def test__output_format__process_chunked(self):
+        target = self.TestMeasure.process(self.df, None, **self.kwargs)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'input.csv')
+            self.df.to_csv(path)
+            for output_format in ['csv.gz', 'parquet']:
+                self.TestMeasure.process_chunked(path, tmp, chunksize=7, output_format=output_format, **self.kwargs)
+                source = self.TestMeasure.load(os.path.join(tmp, f'test.{output_format}'))
+                self.assertTrue(np.allclose(source.values, target.values, equal_nan=True))
+                self.assertTrue((source.index == target.index).all())
+            with self.assertRaises(ValueError):
+                self.TestMeasure.process_chunked(path, tmp, output_format='store', **self.kwargs)
+
+    def test__empty__process_chunked(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'input.csv')
+            self.df.to_csv(path)
+            # nothing is written without an output path
+            idx = self.TestMeasure.process_chunked(path, None, chunksize=7, **self.kwargs)
+            self.assertEqual(len(idx), (self.df[['a', 'b', 'c']] > 3).sum().sum())
+            self.assertEqual(os.listdir(tmp), ['input.csv'])
+            for name in ['empty.csv', 'empty.parquet']:
+                path = os.path.join(tmp, name)
+                if name.endswith('.csv'):
+                    open(path, 'w').close()
+                else:
+                    self.df.iloc[:0].to_parquet(path)
+                idx = self.TestMeasure.process_chunked(path, tmp)
+                self.assertEqual(list(idx.columns), ['index', 'column'])
+                self.assertEqual(len(idx), 0)
+
+
+class TestProcessIncremental(unittest.TestCase):
+
+    def setUp(self):
+        class TestMeasure(Measure):
+            @classmethod
+            def get_prefix(cls):
+                return 'test'
+
+            @classmethod
+            def get_cols(cls):
+                return [f'test_{i}' for i in range(3)]
+
+            @classmethod
+            def get_score_suffixes(cls):
+                return ['score']
+
+            @classmethod
+            def get_min(cls):
+                return 0
+
+            @classmethod
+            def get_max(cls):
+                return 3
+
+            @classmethod
+            def check_range(cls, df):
+                vals = [i for i in range(0, 3 + 1)]
+                return cls.argwhere(cls.is_invalid_discrete(df[cls.get_cols()], vals))
+
+            @classmethod
+            def score(cls, df):
+                score = df[cls.get_cols()].sum(axis=1, skipna=False)
+                score.name = f"{cls.get_prefix()}_{cls.get_score_suffixes()[-1]}"
+                return score
+
+        self.TestMeasure = TestMeasure
+        np.random.seed(0)
+        n = 20
+        df = pd.DataFrame(np.random.randint(low=0, high=5, size=(n, 3)), columns=TestMeasure.get_cols())
+        df['ID'] = [f'sub{i}' for i in range(n)]
+        df['SES'] = 'baseline'
+        df['AGE'] = np.arange(n) + 20.5
+        self.df = df.set_index(['ID', 'SES', 'AGE'])
+
+    def test__changed_rows__process_incremental(self):
+        new = self.df.copy()
+        new.iloc[3, 0] = 4
+        new.iloc[5, 1] = np.nan
+        added = pd.DataFrame([[1, 2, 3]], columns=self.TestMeasure.get_cols(),
+                             index=pd.MultiIndex.from_tuples([('sub99', 'baseline', 30.5)], names=['ID', 'SES', 'AGE']))
+        # change two rows, drop one and add one
+        new = pd.concat([new.drop(index='sub0', level='ID'), added])
+        with tempfile.TemporaryDirectory() as tmp:
+            self.TestMeasure.process_incremental(self.df, tmp)
+            profiler = Profiler(memory=False)
+            source = self.TestMeasure.process_incremental(new, tmp, profiler=profiler)
+            saved = pd.read_csv(os.path.join(tmp, 'test.csv'), index_col=[0, 1, 2])
+        target = self.TestMeasure.process(new, None)
+        records = profiler.to_frame().set_index('stage')
+        self.assertEqual(records.loc['subset', 'rows'], 3)
+        self.assertTrue(source.equals(target))
+        self.assertTrue(np.allclose(saved.values, target.values, equal_nan=True))
+
+    def test__options__process_incremental(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.TestMeasure.process_incremental(self.df, tmp)
+            source = self.TestMeasure.process_incremental(self.df, tmp, keep='last')
+        target = self.TestMeasure.process(self.df, None, keep='last')
+        self.assertTrue(source.equals(target))
+
+    def test__fingerprint__process_incremental(self):
+        class TestMeasureChanged(self.TestMeasure):
+            @classmethod
+            def get_fingerprint(cls):
+                return 'changed'
+
+        with tempfile.TemporaryDirectory() as tmp:
+            self.TestMeasure.process_incremental(self.df, tmp)
+            self.assertEqual(sorted(os.listdir(os.path.join(tmp, 'test.cache'))), ['data.parquet', 'keys.parquet'])
+            profiler = Profiler(memory=False)
+            # same prefix and data but other cleaning code, so nothing is reused
+            TestMeasureChanged.process_incremental(self.df, tmp, profiler=profiler)
+        records = profiler.to_frame().set_index('stage')
+        self.assertEqual(records.loc['subset', 'rows'], len(self.df))
+
+    def test__col_num__process_incremental(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.TestMeasure.process_incremental(self.df, tmp, rev_code=True, col_num=[1])
+            source = self.TestMeasure.process_incremental(self.df, tmp, rev_code=True, col_num=[2])
+        target = self.TestMeasure.process(self.df, None, rev_code=True, col_num=[2])
+        self.assertTrue(source.equals(target))
+
+
+class TestSave(unittest.TestCase):
+
+    def setUp(self):
+        class TestMeasure(Measure):
+            @classmethod
+            def get_prefix(cls):
+                return 'test'
+
+        self.TestMeasure = TestMeasure
+        df = pd.DataFrame(
+            [[0, 1, 'a'],
+             [3, 2, 'b']],
+            columns=['test_0', 'test_1', 'test_2']
+        )
+        df['test_2'] = df['test_2'].astype('category')
+        df['ID'] = ['x', 'y']
+        df['SES'] = 1
+        df['AGE'] = [20.0, np.nan]
+        self.df = df.set_index(['ID', 'SES', 'AGE'])
+
+    def test__formats__save(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for output_format, extension in [('csv', 'csv'), ('csv.gz', 'csv.gz'),
+                                             ('parquet', 'parquet'), ('feather', 'feather'), ('store', 'store')]:
+                self.TestMeasure.save(self.df, tmp, output_format=output_format)
+                source = self.TestMeasure.load(os.path.join(tmp, f'test.{extension}'), columns=['test_0', 'test_2'])
+                self.assertEqual(list(source.columns), ['test_0', 'test_2'])
+                self.assertEqual(list(source.index.names), ['ID', 'SES', 'AGE'])
+                self.assertTrue((source['test_0'] == self.df['test_0'].values).all())
+                if output_format in ['parquet', 'feather', 'store']:
+                    self.assertTrue(source.equals(self.df[['test_0', 'test_2']]))
+
+
 class TestScoreIfNeeded(unittest.TestCase):
 
     def setUp(self):
@@ -330,6 +739,40 @@ class TestScoreIfNeeded(unittest.TestCase):
         self.assertTrue((source == target).all().all())
 
 
+class TestProcessMemory(unittest.TestCase):
+
+    @staticmethod
+    def make_data(n):
+        rng = np.random.default_rng(0)
+        x = rng.integers(0, 4, size=(n, 42)).astype(float)
+        x[rng.random(x.shape) < 0.01] = 5
+        x[rng.random(x.shape) < 0.01] = np.nan
+        df = pd.DataFrame(x, columns=DASS42.get_cols())
+        df.index = pd.MultiIndex.from_arrays(
+            [np.arange(n), np.ones(n, dtype=int), rng.uniform(18, 80, n)], names=['ID', 'SES', 'AGE'])
+        return df
+
+    @staticmethod
+    def get_peak(df):
+        tracemalloc.start()
+        try:
+            DASS42.process(df, None)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test__peak__process(self):
+        # 100k rows by default, PSYPY_MEMORY_TEST_ROWS sets it for larger runs (e.g. 1000000)
+        n = int(os.environ.get('PSYPY_MEMORY_TEST_ROWS', 100000))
+        # row block temporaries grow with the data up to BLOCK_ROWS, so both sizes are well above it
+        n = max(n, 20 * DASS42.BLOCK_ROWS)
+        small, large = self.make_data(n // 2), self.make_data(n)
+        small_size, large_size = (df.memory_usage(deep=True).sum() for df in [small, large])
+        # only the part of the peak that grows with the data, fixed overhead dominates small inputs
+        growth = (self.get_peak(large) - self.get_peak(small)) / (large_size - small_size)
+        self.assertLess(growth, 1.6)
+
+
 # TODO: implement tests for other methods
 
 
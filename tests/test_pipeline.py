@@ -0,0 +1,144 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+import numpy as np
+import pandas as pd
+from psypy.clean.clinical.dass import DASS42
+from psypy.clean.clinical.gad import GAD7
+from psypy.clean.clinical.phq import PHQ9
+from psypy.clean.measure import ExceptionWithData
+from psypy.clean.pipeline import process_many, read_measures
+from psypy.clean.summary import Summary
+from psypy.clean.profiling import Profiler
+
+
+class TestProcessMany(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.measures = [PHQ9, GAD7, DASS42]
+        cols = [col for measure in self.measures for col in measure.get_cols()]
+        df = pd.DataFrame(
+            np.random.randint(low=0, high=5, size=(10, len(cols))),
+            columns=cols
+        )
+        df['other'] = 'x'
+        df['ID'] = np.arange(10)
+        df['SES'] = 1
+        df['AGE'] = 30.5
+        self.df = df.set_index(['ID', 'SES', 'AGE'])
+
+    def test__standard__process_many(self):
+        source = process_many(self.df, self.measures, None)
+        self.assertEqual(list(source), [measure.__name__ for measure in self.measures])
+        for measure in self.measures:
+            target = measure.process(self.df, None)
+            self.assertTrue(source[measure.__name__].equals(target))
+
+    def test__thread__process_many(self):
+        source = process_many(self.df, self.measures, None, executor='thread', max_workers=2)
+        target = process_many(self.df, self.measures, None)
+        for measure in self.measures:
+            self.assertTrue(source[measure.__name__].equals(target[measure.__name__]))
+
+    def test__process__process_many(self):
+        source = process_many(self.df, self.measures, None, executor='process', max_workers=2)
+        target = process_many(self.df, self.measures, None)
+        for measure in self.measures:
+            self.assertTrue(source[measure.__name__].equals(target[measure.__name__]))
+
+    def test__process__raise__process_many(self):
+        with self.assertRaises(ExceptionWithData) as cm:
+            process_many(self.df, self.measures, None, to_na=False, executor='process')
+        self.assertGreater(len(cm.exception.data), 0)
+
+    def test__profiler__process_many(self):
+        for executor in [None, 'process']:
+            profiler = Profiler(memory=executor is None)
+            process_many(self.df, self.measures, None, executor=executor, profiler=profiler)
+            source = profiler.to_frame()
+            self.assertEqual(source.loc[source['stage'] == 'copy', 'measure'].tolist(), ['Base'])
+            self.assertEqual(set(source.loc[source['stage'] == 'score', 'measure']),
+                             set([measure.__name__ for measure in self.measures]))
+            self.assertTrue((source['seconds'] >= 0).all())
+            self.assertEqual(source.loc[source['stage'] == 'drop_na', 'rows'].tolist(), [10] * 3)
+
+    def test__profiler__tracing(self):
+        profiler = Profiler()
+        process_many(self.df, self.measures, None, profiler=profiler)
+        # tracing started by the profiler does not outlive it
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertTrue((profiler.to_frame()['memory'] >= 0).all())
+
+
+class TestReadMeasures(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        n = 10
+        df = pd.DataFrame(np.random.randint(low=0, high=4, size=(n, 7)), columns=[f'gad_{i}' for i in range(7)])
+        for col in DASS42.get_cols():
+            df[col] = np.random.randint(low=0, high=4, size=n)
+        df['summary_sex'] = np.random.choice(['M', 'F'], size=n)
+        df['summary_mdd_current'] = np.random.randint(low=0, high=2, size=n)
+        df['other'] = 'x'
+        df['dob'] = '1990-1-1'
+        df['ID'] = np.arange(n)
+        df['SES'] = 1
+        df['AGE'] = 30.5
+        self.mapping = {f'gad_{i}': col for i, col in enumerate(GAD7.get_cols())}
+        self.df = df
+
+    def test__standard__read_measures(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'export.csv')
+            self.df.to_csv(path, index=False)
+            for engine in ['pyarrow', 'c']:
+                source = read_measures(path, [GAD7, DASS42, Summary], mapping=self.mapping, extra_cols=['dob'],
+                                       engine=engine)
+                self.assertEqual(list(source.index.names), ['ID', 'SES', 'AGE'])
+                self.assertNotIn('other', source.columns)
+                self.assertEqual(list(source.columns), [x for x in self.df.columns if x not in ['other', 'ID', 'SES', 'AGE']])
+                self.assertEqual(source['gad_0'].dtype, 'Int16')
+                self.assertEqual(source['summary_sex'].dtype, 'category')
+                self.assertEqual(source['summary_mdd_current'].dtype, 'Int8')
+                target = DASS42.process(pd.read_csv(path).set_index(['ID', 'SES', 'AGE']), None)
+                self.assertTrue(np.allclose(DASS42.process(source, None).astype(float), target, equal_nan=True))
+
+    def test__fallback__read_measures(self):
+        self.df['gad_0'] = self.df['gad_0'].astype(float)
+        self.df.loc[0, 'gad_0'] = 2.5
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'export.csv')
+            self.df.to_csv(path, index=False)
+            with self.assertWarns(UserWarning):
+                source = read_measures(path, [GAD7, Summary], mapping=self.mapping)
+        self.assertEqual(source.loc[0, 'gad_0'].iloc[0], 2.5)
+        # only the column with the non integer value is relaxed
+        self.assertEqual(source['gad_0'].dtype, 'Float32')
+        self.assertEqual(source['gad_1'].dtype, 'Int16')
+        self.assertEqual(source['summary_sex'].dtype, 'category')
+        # flagged invalid when cleaned
+        self.assertTrue(pd.isna(GAD7.process(source, None, mapping=self.mapping).iloc[0, 0]))
+
+    def test__malformed__read_measures(self):
+        self.df['gad_0'] = self.df['gad_0'].astype(object)
+        self.df.loc[0, 'gad_0'] = 'n/a?'
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'export.csv')
+            self.df.to_csv(path, index=False)
+            for engine in ['pyarrow', 'c']:
+                with self.assertWarns(UserWarning):
+                    source = read_measures(path, [GAD7, Summary], mapping=self.mapping, engine=engine)
+                self.assertTrue(pd.isna(source.loc[0, 'gad_0'].iloc[0]))
+                self.assertEqual(source['gad_0'].iloc[1:].tolist(), self.df['gad_0'].iloc[1:].tolist())
+                # other columns keep their declared dtypes
+                self.assertEqual(source['gad_0'].dtype, 'Int16')
+                self.assertEqual(source['gad_1'].dtype, 'Int16')
+                self.assertEqual(source['summary_mdd_current'].dtype, 'Int8')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import inspect
+import subprocess
+import sys
+import unittest
+from importlib import import_module
+
+from psypy.clean import registry
+from psypy.clean.measure import Base
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test__complete__registry(self):
+        for subpackage in registry.SUBPACKAGES:
+            package = import_module(f"psypy.clean.{subpackage}")
+            # regenerate with python -m psypy.clean.registry if this fails
+            self.assertEqual(package.MEASURES, registry.scan(subpackage))
+            for name, module in package.MEASURES.items():
+                cls = getattr(import_module(f"{package.__name__}.{module}"), name)
+                self.assertTrue(inspect.isclass(cls) and issubclass(cls, Base))
+                # only measures that can be processed
+                self.assertFalse(inspect.isabstract(cls))
+
+    def test__lazy__registry(self):
+        code = (
+            "import sys\n"
+            "from psypy.clean.clinical import PHQ9\n"
+            "assert PHQ9.get_prefix() == 'phq9'\n"
+            "assert 'psypy.clean.clinical.dass' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, '-c', code], check=True)
+
+    def test__missing__registry(self):
+        import psypy.clean.clinical
+        with self.assertRaises(AttributeError):
+            psypy.clean.clinical.NotAMeasure
+
+
+class TestDetect(unittest.TestCase):
+
+    def test__standard__detect(self):
+        from psypy.clean.clinical import DASS42, GAD7, HDRS17, PHQ9
+        columns = ['ID', 'other', *DASS42.get_cols(), *HDRS17.get_cols(), *PHQ9.get_cols()[:-2], 'gad_1']
+        source = registry.detect(columns, mapping={'gad_1': GAD7.get_cols()[0]})
+        self.assertEqual(source.loc['DASS42', 'status'], 'complete')
+        self.assertEqual(source.loc['HDRS17', 'status'], 'complete')
+        self.assertEqual(source.loc['HDRS21', 'status'], 'absent')
+        self.assertEqual(source.loc['PHQ9', 'status'], 'partial')
+        self.assertEqual(source.loc['PHQ9', 'missing'], PHQ9.get_cols()[-2:])
+        self.assertEqual(source.loc['GAD7', 'present'], 1)
+        self.assertEqual(source.loc['WHOQOL', 'status'], 'absent')
+        self.assertEqual(registry.find_measures(columns), [DASS42, HDRS17])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from psypy.clean.store import load_store, write_store
+
+
+class TestStore(unittest.TestCase):
+
+    def setUp(self):
+        n = 10
+        df = pd.DataFrame({
+            'test_0': np.arange(2 * n, dtype=float),
+            'test_1': pd.array(list(range(2 * n - 1)) + [None], dtype='Int16'),
+            'test_2': ['a', 'b', np.nan, 'c'] * (n // 2),
+        })
+        df['ID'] = [f'sub{i:02d}' for i in reversed(range(n))] * 2
+        df['SES'] = ['baseline'] * n + ['followup'] * n
+        df['AGE'] = np.arange(2 * n) + 20.0
+        self.df = df.set_index(['ID', 'SES', 'AGE'])
+
+    def test__standard__load_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'test.store')
+            write_store(self.df, path)
+            source = load_store(path)
+        # rows are sorted by ID within each session
+        target = self.df.groupby('SES', sort=False, group_keys=False).apply(lambda x: x.sort_index(level='ID'))
+        self.assertTrue(source.equals(target))
+        self.assertEqual(list(source.dtypes), list(self.df.dtypes))
+
+    def test__select__load_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'test.store')
+            write_store(self.df, path)
+            source = load_store(path, columns=['test_0'], sessions=['followup'], ids=slice('sub02', 'sub04'))
+            # a range of IDs of one session keeps columns memory mapped
+            self.assertIsInstance(source['test_0'].values.base, np.memmap)
+            listed = load_store(path, columns=['test_2'], ids=['sub03', 'sub99'])
+        self.assertEqual(list(source.index.get_level_values('ID')), ['sub02', 'sub03', 'sub04'])
+        self.assertEqual(list(source['test_0']), [17.0, 16.0, 15.0])
+        self.assertEqual(list(listed.index.get_level_values('SES')), ['baseline', 'followup'])
+        self.assertEqual(list(listed['test_2'].fillna('')), ['', 'a'])
+
+
+if __name__ == "__main__":
+    unittest.main()